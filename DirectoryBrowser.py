@@ -1,6 +1,10 @@
 import sys
 import ssl
 import os
+import time
+import threading
+from itertools import islice
+from types import MappingProxyType
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -8,13 +12,21 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton, QComboBox,
     QVBoxLayout, QHBoxLayout, QMessageBox, QTreeWidget, QTreeWidgetItem,
-    QTableWidget, QTableWidgetItem, QSplitter, QMainWindow, QStatusBar,
+    QTableView, QSplitter, QMainWindow, QStatusBar,
     QTabWidget, QToolBar, QSizePolicy, QHeaderView
 )
-from PyQt6.QtCore import Qt, QSize, QTimer, pyqtSignal
+from PyQt6.QtCore import (
+    Qt, QSize, QTimer, QMutex, QThreadPool, QAbstractTableModel, QModelIndex, pyqtSignal
+)
 from PyQt6.QtGui import QIcon, QAction
-from ldap3 import Server, Connection, ALL, Tls, SUBTREE
+from ldap3 import Server, Connection, ALL, Tls, SUBTREE, LEVEL
 from ldap3.core.exceptions import LDAPException
+from ldap3.utils.conv import escape_filter_chars
+from ldap3.utils.dn import to_dn
+
+# Needed in standalone mode too: LDAP calls always run on LdapWorker threads.
+# helpers.py sits next to this file and only needs PyQt6 and ldap3.
+from helpers import LdapWorker, get_connection_pool, close_connection_pool
 
 # Import will be used when running as part of the application
 try:
@@ -24,8 +36,7 @@ try:
 except ImportError:
     # Minimal imports for standalone testing
     def domain_to_base_dn(domain: str) -> str:
-        parts = domain.split('.')
-        return ','.join(f"DC={part}" for part in parts)
+        return "DC=" + domain.replace(".", ",DC=")
     
     def get_app_stylesheet():
         return ""
@@ -47,15 +58,136 @@ except ImportError:
     
     # Mock UserWindow class
     class UserWindow(QWidget):
-        user_action_completed = pyqtSignal()
+        user_action_completed = pyqtSignal(str)
         
         def __init__(self, ldap_conn, mode=UserOperation.CREATE, user_dn=None, 
                     ou_list=None, current_domain=None, domains=None):
             super().__init__()
 
 
+# Domain lookups built once from DOMAIN_CONFIG, keyed by lowercased name
+_DC_FQDN_TO_DOMAIN = {dc.lower(): fqdn for netbios, (fqdn, dcs) in DOMAIN_CONFIG.items() for dc in dcs}
+_FQDN_TO_NETBIOS = {fqdn.lower(): netbios for netbios, (fqdn, _) in DOMAIN_CONFIG.items()}
+
+# NetBIOS -> FQDN, shared read-only with every UserWindow
+_DOMAINS = MappingProxyType({netbios: fqdn for netbios, (fqdn, _) in DOMAIN_CONFIG.items()})
+
+# TLS settings shared by every LDAPS connection; PROTOCOL_TLS_CLIENT lets
+# OpenSSL negotiate TLS 1.3 where the DC supports it
+_TLS = Tls(validate=ssl.CERT_REQUIRED, version=ssl.PROTOCOL_TLS_CLIENT, ciphers='HIGH:!aNULL:!MD5')
+
+# Global Catalog port, used to browse domains other than the DC's own
+GLOBAL_CATALOG_PORT = 3269
+
+# Page size for paged LDAP searches (AD's default MaxPageSize is 1000)
+PAGE_SIZE = 500
+
+# Most results shown for a free-text search before asking to refine it
+SEARCH_RESULT_LIMIT = 2000
+
+# Delay after the last keystroke before searching as the user types (ms)
+SEARCH_DEBOUNCE_MS = 300
+
+# Seconds a search result is reused before the directory is queried again
+SEARCH_CACHE_TTL = 30
+
+# Most search results kept at once; the oldest are dropped first
+SEARCH_CACHE_MAX_ENTRIES = 100
+
+# Friendly type names keyed by the lowercased first RDN of objectCategory
+OBJECT_TYPES = {
+    "cn=person": "User",
+    "cn=computer": "Computer",
+    "cn=group": "Group",
+}
+
+
+def classify_object_category(obj_cat: str) -> str:
+    """
+    Map an objectCategory DN to a friendly type name.
+    E.g., 'CN=Person,CN=Schema,...' -> 'User'
+    """
+    head, _, _ = obj_cat.partition(",")
+    return OBJECT_TYPES.get(head.lower(), head.replace("CN=", ""))
+
+
+def first_value(attrs: dict, name: str):
+    """
+    Return a single value from a search response's attributes dict.
+    Multi-valued attributes come back as lists, so take the first element.
+    """
+    value = attrs.get(name)
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+class LdapObjectModel(QAbstractTableModel):
+    """
+    Read-only table model over a list of row tuples.
+    
+    Each row holds one string per header; rows may carry extra trailing
+    values (e.g. the object's DN) that are kept for the caller but not shown.
+    """
+    
+    def __init__(self, headers, parent=None):
+        """
+        Args:
+            headers: Column header labels
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self._headers = headers
+        self._rows = []
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._rows[index.row()][index.column()]
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+    
+    def set_rows(self, rows):
+        """
+        Replace the table contents
+        
+        Args:
+            rows: List of row tuples
+        """
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+    
+    def append_rows(self, rows):
+        """
+        Add rows to the end of the table
+        
+        Args:
+            rows: List of row tuples
+        """
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+    
+    def row(self, row):
+        """Return the full tuple for a row, including hidden trailing values"""
+        return self._rows[row]
+
+
 class DirectoryBrowser(QMainWindow):
-    def __init__(self, login_domain, login_domain_dns, username, password, dc_fqdn, base_dn, port):
+    def __init__(self, login_domain, login_domain_dns, username, password, dc_fqdn, base_dn, port, conn=None):
         """
         Initialize the directory browser
         
@@ -67,6 +199,8 @@ class DirectoryBrowser(QMainWindow):
             dc_fqdn: Domain controller FQDN
             base_dn: Base DN for searches
             port: LDAP port (636 or 3269 for Global Catalog)
+            conn: Optional connection already bound to dc_fqdn on port, reused
+                instead of binding again
         """
         super().__init__()
         self.login_domain = login_domain
@@ -77,13 +211,31 @@ class DirectoryBrowser(QMainWindow):
         self.base_dn = base_dn  # Naming context for OU browsing
         self.port = port
         self.conn = None
+        self.search_pool = None  # LdapConnectionPool for browsing and search
         self.server = None
+        self.connections = {}  # port -> (Server, Connection, LdapConnectionPool), kept bound
+        self.ou_items = {}  # DN -> tree item for every OU loaded so far
+        self.loaded_ous = set()  # DNs whose child OUs have been fetched
+        
+        # LDAP calls run on the thread pool; the lock serializes use of the
+        # shared (non-pooled) connection and ldap_tasks holds the latest task
+        # per name
+        self.conn_lock = QMutex()
+        self.ldap_tasks = {}
+        # Search results are stored by worker threads and invalidated on the
+        # GUI thread, so the cache is only touched under search_cache_lock.
+        # Invalidating bumps the generation, so searches already in flight
+        # don't store what they read before it.
+        self.search_cache = {}  # (base, filter, attributes, scope, limit) -> (timestamp, entries), oldest first
+        self.search_cache_lock = threading.Lock()
+        self.search_cache_generation = 0
         
         # Use domain config from Login
-        self.domains = {netbios: fqdn for netbios, (fqdn, _) in DOMAIN_CONFIG.items()}
+        self.domains = _DOMAINS
         
         # Determine which domain's DC we're connected to
         self.connected_domain = self.determine_connected_domain()
+        self.home_domain = self.connected_domain  # Reachable on the login port
         
         self.setWindowTitle("Active Directory Management")
         self.setMinimumWidth(900)
@@ -91,23 +243,14 @@ class DirectoryBrowser(QMainWindow):
         self.setup_ui()
         self.setup_toolbar()
         self.setup_statusbar()
-        self.create_connection()
         
-        # Load OUs after a brief delay to ensure connection is ready
-        QTimer.singleShot(100, self.load_ous)
+        # Bind in the background; the OU tree loads once the connection is up
+        self.create_connection(conn)
 
     def determine_connected_domain(self):
         """Determine which domain we're connected to based on the DC"""
-        # Default to login domain
-        connected_domain = self.login_domain_dns
-        
-        # Check if the DC is in a different domain
-        for netbios, (fqdn, dc_list) in DOMAIN_CONFIG.items():
-            if any(dc.lower() == self.dc_fqdn.lower() for dc in dc_list):
-                connected_domain = fqdn
-                break
-                
-        return connected_domain
+        # Default to login domain if the DC isn't in the config
+        return _DC_FQDN_TO_DOMAIN.get(self.dc_fqdn.lower(), self.login_domain_dns)
 
     def setup_ui(self):
         self.central_widget = QWidget()
@@ -125,14 +268,15 @@ class DirectoryBrowser(QMainWindow):
         domain_layout.addWidget(domain_label)
         
         self.domain_combo = QComboBox()
-        # Populate with all domains from DOMAIN_CONFIG
-        for netbios, (fqdn, _) in DOMAIN_CONFIG.items():
+        # Populate with all domains from DOMAIN_CONFIG; filling the combo
+        # must not look like the user picking a domain
+        self.domain_combo.blockSignals(True)
+        for netbios, fqdn in _DOMAINS.items():
             self.domain_combo.addItem(f"{netbios} ({fqdn})", fqdn)
+        self.domain_combo.blockSignals(False)
             
         # Select the connected domain
-        connected_idx = self.domain_combo.findData(self.connected_domain)
-        if connected_idx >= 0:
-            self.domain_combo.setCurrentIndex(connected_idx)
+        self.select_connected_domain()
             
         self.domain_combo.currentIndexChanged.connect(self.update_domain)
         domain_layout.addWidget(self.domain_combo)
@@ -149,6 +293,13 @@ class DirectoryBrowser(QMainWindow):
         self.search_button = QPushButton("Search")
         self.search_button.clicked.connect(self.perform_search)
         self.search_edit.returnPressed.connect(self.perform_search)
+        
+        # Search as the user types, once they pause
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.on_search_timer)
+        self.search_edit.textChanged.connect(self.search_timer.start)
         search_layout.addWidget(self.search_edit)
         search_layout.addWidget(self.search_button)
         top_bar.addLayout(search_layout)
@@ -175,7 +326,9 @@ class DirectoryBrowser(QMainWindow):
         
         self.ou_tree = QTreeWidget()
         self.ou_tree.setHeaderLabel("Organizational Units")
+        self.ou_tree.setUniformRowHeights(True)  # Rows are single-line; skip per-row measuring
         self.ou_tree.itemClicked.connect(self.on_ou_selected)
+        self.ou_tree.itemExpanded.connect(self.expand_ou)
         left_layout.addWidget(self.ou_tree)
         
         # Right side: Object table with controls
@@ -186,13 +339,15 @@ class DirectoryBrowser(QMainWindow):
         object_label = QLabel("Objects:")
         right_layout.addWidget(object_label)
         
-        self.object_table = QTableWidget()
-        self.object_table.setColumnCount(3)
-        self.object_table.setHorizontalHeaderLabels(["Display Name", "Type", "DN"])
+        # Rows are (name, type, DN)
+        self.object_model = LdapObjectModel(["Display Name", "Type", "DN"], self)
+        self.object_table = QTableView()
+        self.object_table.setModel(self.object_model)
         self.object_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
         self.object_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        self.object_table.cellDoubleClicked.connect(self.on_object_double_clicked)
+        self.object_table.doubleClicked.connect(self.on_object_double_clicked)
         self.object_table.verticalHeader().setDefaultSectionSize(30)  # Taller rows
+        self.object_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.object_table.setAlternatingRowColors(True)  # Better visual separation
         right_layout.addWidget(self.object_table)
         
@@ -207,7 +362,7 @@ class DirectoryBrowser(QMainWindow):
         self.edit_button.setEnabled(False)  # Only enable when an item is selected
         button_layout.addWidget(self.edit_button)
         
-        self.object_table.itemSelectionChanged.connect(self.update_button_states)
+        self.object_table.selectionModel().selectionChanged.connect(self.update_button_states)
         
         right_layout.addLayout(button_layout)
         
@@ -229,13 +384,15 @@ class DirectoryBrowser(QMainWindow):
         self.search_results_label = QLabel("No search results")
         search_layout.addWidget(self.search_results_label)
         
-        self.search_results_table = QTableWidget()
-        self.search_results_table.setColumnCount(4)
-        self.search_results_table.setHorizontalHeaderLabels(["Display Name", "SAM Account", "Type", "Location"])
+        # Rows are (name, SAM account, type, location, DN); the DN isn't shown
+        self.search_model = LdapObjectModel(["Display Name", "SAM Account", "Type", "Location"], self)
+        self.search_results_table = QTableView()
+        self.search_results_table.setModel(self.search_model)
         self.search_results_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
         self.search_results_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
-        self.search_results_table.cellDoubleClicked.connect(self.on_search_result_double_clicked)
+        self.search_results_table.doubleClicked.connect(self.on_search_result_double_clicked)
         self.search_results_table.verticalHeader().setDefaultSectionSize(30)  # Taller rows
+        self.search_results_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.search_results_table.setAlternatingRowColors(True)  # Better visual separation
         search_layout.addWidget(self.search_results_table)
         
@@ -251,7 +408,7 @@ class DirectoryBrowser(QMainWindow):
         
         # Refresh action
         refresh_action = QAction("Refresh", self)
-        refresh_action.triggered.connect(self.refresh_view)
+        refresh_action.triggered.connect(lambda: self.refresh_view())
         toolbar.addAction(refresh_action)
         
         toolbar.addSeparator()
@@ -275,21 +432,99 @@ class DirectoryBrowser(QMainWindow):
         self.setStatusBar(self.statusbar)
         self.statusbar.showMessage(f"Connected to {self.connected_domain} via {self.dc_fqdn}")
 
-    def create_connection(self):
-        tls_config = Tls(validate=ssl.CERT_REQUIRED, version=ssl.PROTOCOL_TLSv1_2)
-        try:
-            self.server = Server(f"ldaps://{self.dc_fqdn}", port=self.port, tls=tls_config, get_info=ALL)
-            bind_user = f"{self.username}@{self.login_domain_dns}"
-            self.conn = Connection(self.server, user=bind_user, password=self.password, auto_bind=True)
+    def run_ldap_task(self, name, fn, on_finished, on_error, lock=None, on_progress=None):
+        """
+        Run a blocking LDAP call on the thread pool
+        
+        Only the most recent task submitted under a given name delivers its
+        result, so a slow reply can never overwrite a newer one.
+        
+        Args:
+            name: Task name, e.g. "search"
+            fn: Callable performing the LDAP work
+            on_finished: Called on the GUI thread with fn's return value
+            on_error: Called on the GUI thread with the raised exception
+            lock: Lock held while fn runs; needed when fn uses self.conn
+            on_progress: If given, fn is called with a `report` callable and
+                on_progress receives whatever it reports, on the GUI thread
+        """
+        worker = LdapWorker(fn, lock=lock, progress=on_progress is not None)
+        self.ldap_tasks[name] = worker
+        
+        def deliver(callback, value):
+            if self.ldap_tasks.get(name) is worker:
+                del self.ldap_tasks[name]
+                callback(value)
+        
+        def deliver_progress(value):
+            if self.ldap_tasks.get(name) is worker:
+                on_progress(value)
+        
+        worker.signals.finished.connect(lambda result: deliver(on_finished, result))
+        worker.signals.error.connect(lambda e: deliver(on_error, e))
+        if on_progress:
+            worker.signals.progress.connect(deliver_progress)
+        QThreadPool.globalInstance().start(worker)
+
+    def bind_connection(self, port, conn=None):
+        """
+        Open and bind connections to the DC (blocking, run on a worker)
+        
+        A regular connection is opened and handed to the user editor windows,
+        along with its connection pool. The browser's own searches check
+        connections out of the same pool, so tree expansion, OU listing and
+        search can run in parallel instead of queueing behind a single socket.
+        
+        The RootDSE and schema are both read at bind time: the user editor
+        needs defaultNamingContext, and without the schema ldap3 returns
+        typed attributes such as userAccountControl and pwdLastSet as strings.
+        
+        Args:
+            port: LDAP port to connect on
+            conn: Optional already-bound connection to use as the regular one
+            
+        Returns:
+            Tuple of (Server, Connection, LdapConnectionPool)
+        """
+        bind_user = f"{self.username}@{self.login_domain_dns}"
+        if conn:
+            server = conn.server
+            if server.info is None or server.schema is None:
+                # Login binds without reading server info; read the RootDSE
+                # and schema now, as a fresh bind below would
+                server.get_info = ALL
+                conn.refresh_server_info()
+        else:
+            server = Server(f"ldaps://{self.dc_fqdn}", port=port, tls=_TLS, get_info=ALL)
+            conn = Connection(server, user=bind_user, password=self.password, auto_bind=True)
+        return server, conn, get_connection_pool(conn)
+
+    def create_connection(self, conn=None):
+        """
+        Bind to the DC in the background, then load the OU tree
+        
+        Args:
+            conn: Optional already-bound connection to reuse
+        """
+        self.statusbar.showMessage(f"Connecting to {self.connected_domain} via {self.dc_fqdn}...")
+        
+        def connected(result):
+            self.connections[self.port] = result
+            self.server, self.conn, self.search_pool = result
             
             # Get the base_dn for the current domain
             self.base_dn = domain_to_base_dn(self.connected_domain)
             
             self.statusbar.showMessage(f"Connected to {self.connected_domain} via {self.dc_fqdn}")
-        except LDAPException as e:
+            self.load_ous()
+        
+        def failed(e):
             QMessageBox.critical(self, "LDAP Error", f"Failed to connect: {e}")
             self.conn = None
             self.statusbar.showMessage("Connection failed")
+        
+        self.run_ldap_task("connect", lambda: self.bind_connection(self.port, conn), connected, failed,
+                           lock=self.conn_lock)
 
     def load_ous(self):
         if not self.conn:
@@ -297,63 +532,187 @@ class DirectoryBrowser(QMainWindow):
             return
             
         self.statusbar.showMessage(f"Loading organizational units for {self.connected_domain}...")
-        QApplication.processEvents()
         
         # Make sure base_dn is set to the correct domain
         if not self.base_dn.lower().startswith("dc="):
             self.base_dn = domain_to_base_dn(self.connected_domain)
-            
-        search_filter = "(objectClass=organizationalUnit)"
-        try:
-            # Use the connected domain's DN for searching
-            self.conn.search(search_base=self.base_dn, search_filter=search_filter,
-                             search_scope=SUBTREE, attributes=["ou", "distinguishedName", "name"])
-        except LDAPException as e:
+        base_dn = self.base_dn
+        
+        def failed(e):
             QMessageBox.critical(self, "LDAP Error", f"Failed to search for OUs: {e}")
             self.statusbar.showMessage("Error loading OUs")
-            return
+        
+        self.run_ldap_task("ous", lambda: self._search_child_ous(base_dn),
+                           self.populate_ou_tree, failed)
 
+    def populate_ou_tree(self, entries):
+        """
+        Rebuild the OU tree from the top-level OU search results
+        
+        Args:
+            entries: Search response entries from _search_child_ous
+        """
+        top_items = [self._make_ou_item(entry) for entry in entries]
+        
+        # Expansions still in flight belong to items that are about to go away
+        for name in [n for n in self.ldap_tasks if n.startswith("expand:")]:
+            del self.ldap_tasks[name]
+        
         self.ou_tree.clear()
         self.ou_items = {}
-        
+        self.loaded_ous = set()
+
         # Debug - check what we got back
-        if not self.conn.entries:
+        if not top_items:
             self.statusbar.showMessage(f"No OUs found for {self.connected_domain} ({self.base_dn})")
             return
+
+        # Suspend repaints and signals while the tree is rebuilt so Qt doesn't
+        # relayout after every insert
+        self.ou_tree.setUpdatesEnabled(False)
+        self.ou_tree.blockSignals(True)
+        try:
+            self.ou_tree.addTopLevelItems(top_items)
+        finally:
+            self.ou_tree.blockSignals(False)
+            self.ou_tree.setUpdatesEnabled(True)
+
+        for item in top_items:
+            self.ou_items[item.data(0, Qt.ItemDataRole.UserRole)] = item
+
+        self.statusbar.showMessage(f"Loaded {len(top_items)} top-level organizational units for {self.connected_domain}")
+
+    def expand_ou(self, item):
+        """Fetch the child OUs of a tree item the first time it is expanded"""
+        ou_dn = item.data(0, Qt.ItemDataRole.UserRole)
+        task_name = f"expand:{ou_dn}"
+        if not ou_dn or ou_dn in self.loaded_ous or task_name in self.ldap_tasks:
+            return
+
+        ou_name = item.text(0)
+        self.statusbar.showMessage(f"Loading organizational units under {ou_name}...")
+        
+        def loaded(entries):
+            # Replace the placeholder with the real children
+            children = [self._make_ou_item(entry) for entry in entries]
+            item.takeChildren()
+            item.addChildren(children)
+            for child in children:
+                self.ou_items[child.data(0, Qt.ItemDataRole.UserRole)] = child
+            self.loaded_ous.add(ou_dn)
             
-        # Process the entries
-        for entry in self.conn.entries:
-            if not hasattr(entry, "distinguishedName"):
-                continue
-                
-            dn = entry.distinguishedName.value
+            self.statusbar.showMessage(f"Loaded {len(children)} organizational units under {ou_name}")
+        
+        def failed(e):
+            QMessageBox.critical(self, "LDAP Error", f"Failed to search for OUs: {e}")
+            self.statusbar.showMessage("Error loading OUs")
+        
+        self.run_ldap_task(task_name, lambda: self._search_child_ous(ou_dn), loaded, failed)
+
+    def cached_search(self, search_base, search_filter, attributes, scope=SUBTREE, limit=None, report=None):
+        """
+        Run a paged search on a pooled connection, reusing a recent result
+        
+        Results are kept for SEARCH_CACHE_TTL seconds so clicking the same OU
+        again or repeating a search doesn't go back to the DC.
+        
+        Args:
+            search_base: DN to search under
+            search_filter: LDAP filter
+            attributes: Attributes to return
+            scope: Search scope
+            limit: Stop after this many entries (None for all)
+            report: Optional callable given each page of entries as it arrives
             
-            # Get OU name from the entry
-            if hasattr(entry, "ou"):
-                ou_name = entry.ou.value
-            elif hasattr(entry, "name"):
-                ou_name = entry.name.value
-            else:
-                # Extract from DN as fallback
-                ou_name = dn.split(',')[0].replace('OU=', '')
-                
-            item = QTreeWidgetItem([ou_name])
-            item.setData(0, Qt.ItemDataRole.UserRole, dn)
-            self.ou_items[dn] = item
-
-        # Build tree hierarchy
-        for dn, item in self.ou_items.items():
-            if "," in dn:
-                parent_dn = dn.split(",", 1)[1]
-                if parent_dn in self.ou_items:
-                    self.ou_items[parent_dn].addChild(item)
-                else:
-                    self.ou_tree.addTopLevelItem(item)
-            else:
-                self.ou_tree.addTopLevelItem(item)
-                
-        self.ou_tree.expandAll()  # Expand all nodes for better visibility
-        self.statusbar.showMessage(f"Loaded {len(self.ou_items)} organizational units for {self.connected_domain}")
+        Returns:
+            List of search response entries
+        """
+        key = (search_base, search_filter, tuple(sorted(attributes)), scope, limit)
+        now = time.monotonic()
+        with self.search_cache_lock:
+            hit = self.search_cache.get(key)
+            generation = self.search_cache_generation
+        if hit and now - hit[0] < SEARCH_CACHE_TTL:
+            if report:
+                report(hit[1])
+            return hit[1]
+        
+        # Keep one connection for every page: AD ties the paging cookie to
+        # the connection that started the search
+        entries = []
+        page_start = 0
+        with self.search_pool.get() as conn:
+            results = conn.extend.standard.paged_search(
+                search_base=search_base, search_filter=search_filter,
+                search_scope=scope, attributes=attributes,
+                paged_size=PAGE_SIZE, generator=True)
+            for entry in islice((entry for entry in results if entry.get("type") == "searchResEntry"), limit):
+                entries.append(entry)
+                if report and len(entries) - page_start == PAGE_SIZE:
+                    report(entries[page_start:])
+                    page_start = len(entries)
+        if report and len(entries) > page_start:
+            report(entries[page_start:])
+        
+        with self.search_cache_lock:
+            if generation == self.search_cache_generation:
+                # Drop expired results, then the oldest past the size limit
+                expired = [old for old, hit in self.search_cache.items() if now - hit[0] >= SEARCH_CACHE_TTL]
+                for old in expired:
+                    del self.search_cache[old]
+                self.search_cache.pop(key, None)
+                self.search_cache[key] = (now, entries)
+                while len(self.search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+                    del self.search_cache[next(iter(self.search_cache))]
+        return entries
+
+    def _search_child_ous(self, base_dn):
+        """
+        List the OUs directly below base_dn
+
+        Args:
+            base_dn: DN of the domain or OU to list
+
+        Returns:
+            Search response entries for each child OU
+        """
+        return self.cached_search(base_dn, "(objectClass=organizationalUnit)", ["ou", "name"], scope=LEVEL)
+
+    def _make_ou_item(self, entry):
+        """
+        Create a tree item for an OU search result
+
+        The item gets a placeholder child so the expand arrow is shown before
+        its children have been fetched.
+
+        Args:
+            entry: Search response entry for the OU
+
+        Returns:
+            QTreeWidgetItem for the OU
+        """
+        dn = entry["dn"]
+        attrs = entry["attributes"]
+
+        # Get OU name from the entry
+        ou_name = first_value(attrs, "ou") or first_value(attrs, "name")
+        if not ou_name:
+            # Extract from DN as fallback
+            head, _, _ = dn.partition(",")
+            ou_name = head[3:] if head.upper().startswith("OU=") else head
+
+        item = QTreeWidgetItem([ou_name])
+        item.setData(0, Qt.ItemDataRole.UserRole, dn)
+        item.addChild(QTreeWidgetItem(["Loading..."]))
+        return item
+
+    def select_connected_domain(self):
+        """Show the connected domain in the dropdown without triggering a switch"""
+        connected_idx = self.domain_combo.findData(self.connected_domain)
+        if connected_idx >= 0:
+            self.domain_combo.blockSignals(True)
+            self.domain_combo.setCurrentIndex(connected_idx)
+            self.domain_combo.blockSignals(False)
 
     def update_domain(self):
         """Switch to a different domain when selected in dropdown"""
@@ -361,108 +720,113 @@ class DirectoryBrowser(QMainWindow):
         if domain_idx < 0:
             return
             
+        if self.conn is None:
+            # Still connecting (or the first bind failed); nothing to switch from
+            self.select_connected_domain()
+            return
+            
         new_domain = self.domain_combo.itemData(domain_idx)
         if not new_domain or new_domain == self.connected_domain:
+            # Picking the current domain again cancels a switch still in progress
+            self.ldap_tasks.pop("connect", None)
             return
             
         self.statusbar.showMessage(f"Switching to {new_domain}...")
-        QApplication.processEvents()
-        
-        # Find the netbios name for this domain
-        new_netbios = None
-        for netbios, (fqdn, _) in DOMAIN_CONFIG.items():
-            if fqdn.lower() == new_domain.lower():
-                new_netbios = netbios
-                break
-                
-        if not new_netbios:
-            # Extract from FQDN as fallback
-            new_netbios = new_domain.split('.')[0].upper()
         
-        # Use the existing DC for the connection, but specify GC port
-        tls_config = Tls(validate=ssl.CERT_REQUIRED, version=ssl.PROTOCOL_TLSv1_2)
-        try:
-            if self.conn:
-                self.conn.unbind()
-                
-            # When switching to a new domain, use Global Catalog
-            self.server = Server(f"ldaps://{self.dc_fqdn}", port=3269, tls=tls_config, get_info=ALL)
-            bind_user = f"{self.username}@{self.login_domain_dns}"
-            self.conn = Connection(self.server, user=bind_user, password=self.password, auto_bind=True)
+        # Find the netbios name for this domain, extracting it from the FQDN as fallback
+        new_netbios = _FQDN_TO_NETBIOS.get(new_domain.lower()) or new_domain.split('.')[0].upper()
+        
+        # Use the existing DC for the connection, but when switching to a
+        # new domain, use the Global Catalog port
+        port = self.port if new_domain == self.home_domain else GLOBAL_CATALOG_PORT
+        
+        # Results still in flight belong to the old domain
+        self.ldap_tasks.clear()
+        
+        def switched(result):
+            # Connections stay bound, so switching back later needs no new bind
+            self.connections[port] = result
+            self.server, self.conn, self.search_pool = result
             
             # Update domain info
             self.connected_domain = new_domain
             self.base_dn = domain_to_base_dn(new_domain)
             
+            self.statusbar.showMessage(f"Connected to {new_domain} via {self.dc_fqdn}")
+            
             # Reload OUs for the new domain
             self.load_ous()
-            
-            self.statusbar.showMessage(f"Connected to {new_domain} via {self.dc_fqdn}")
-        except LDAPException as e:
+        
+        def failed(e):
             QMessageBox.critical(self, "LDAP Error", f"Failed to connect to new domain: {e}")
             self.statusbar.showMessage(f"Failed to connect to {new_domain}")
+            # Still connected to the old domain
+            self.select_connected_domain()
+        
+        if port in self.connections:
+            switched(self.connections[port])
+            return
+        
+        self.run_ldap_task("connect", lambda: self.bind_connection(port), switched, failed,
+                           lock=self.conn_lock)
 
     def on_ou_selected(self, item, column):
         ou_dn = item.data(0, Qt.ItemDataRole.UserRole)
-        self.statusbar.showMessage(f"Loading objects from {item.text(0)}...")
-        QApplication.processEvents()
+        if not ou_dn:
+            # Placeholder shown while an OU's children are loading
+            return
+
+        ou_name = item.text(0)
+        self.statusbar.showMessage(f"Loading objects from {ou_name}...")
+        
+        # Rows are added page by page as the search streams in
+        self.object_model.set_rows([])
+        # Resetting the model drops the selection without a selectionChanged signal
+        self.update_button_states()
         
         search_filter = "(|(objectCategory=person)(objectCategory=computer)(objectCategory=group))"
-        try:
-            self.conn.search(search_base=ou_dn, search_filter=search_filter,
-                             search_scope=SUBTREE,
-                             attributes=["sAMAccountName", "displayName", "objectCategory", "distinguishedName", "cn"])
-        except LDAPException as e:
+        
+        def search(report):
+            # Only the OU's direct members; objects in child OUs are listed
+            # when those OUs are selected
+            return self.cached_search(ou_dn, search_filter,
+                                      ["sAMAccountName", "displayName", "objectCategory"],
+                                      scope=LEVEL, report=report)
+        
+        def loaded(entries):
+            self.statusbar.showMessage(f"Loaded {len(entries)} objects from {ou_name}")
+        
+        def failed(e):
             QMessageBox.critical(self, "LDAP Error", f"Failed to search for objects: {e}")
             self.statusbar.showMessage("Error loading objects")
-            return
+        
+        self.run_ldap_task("objects", search, loaded, failed, on_progress=self.add_object_rows)
 
-        entries = self.conn.entries
-        self.object_table.setRowCount(0)
+    def add_object_rows(self, entries):
+        """
+        Append a page of OU search results to the object table
         
+        Args:
+            entries: Search response entries returned by the OU search
+        """
+        rows = []
         for entry in entries:
-            row = self.object_table.rowCount()
-            self.object_table.insertRow(row)
+            attrs = entry["attributes"]
             
-            # Use displayName if available, otherwise fallback to sAMAccountName or CN
-            if hasattr(entry, "displayName") and entry.displayName.value:
-                name = entry.displayName.value
-            elif hasattr(entry, "sAMAccountName") and entry.sAMAccountName.value:
-                name = entry.sAMAccountName.value
-            elif hasattr(entry, "cn"):
-                name = entry.cn.value
-            else:
-                name = "Unknown"
+            # Use displayName if available, otherwise fallback to sAMAccountName
+            name = first_value(attrs, "displayName") or first_value(attrs, "sAMAccountName") or "Unknown"
                 
-            obj_cat = entry.objectCategory.value if hasattr(entry, "objectCategory") else ""
+            obj_cat = first_value(attrs, "objectCategory") or ""
             # Simplify object category display
-            if "person" in obj_cat.lower():
-                obj_type = "User"
-            elif "computer" in obj_cat.lower():
-                obj_type = "Computer"
-            elif "group" in obj_cat.lower():
-                obj_type = "Group"
-            else:
-                obj_type = obj_cat.split(",")[0].replace("CN=", "")
-                
-            dn = entry.distinguishedName.value if hasattr(entry, "distinguishedName") else ""
-            
-            self.object_table.setItem(row, 0, QTableWidgetItem(name))
-            self.object_table.setItem(row, 1, QTableWidgetItem(obj_type))
-            self.object_table.setItem(row, 2, QTableWidgetItem(dn))
+            obj_type = classify_object_category(obj_cat)
             
-        self.statusbar.showMessage(f"Loaded {self.object_table.rowCount()} objects from {item.text(0)}")
+            rows.append((name, obj_type, entry["dn"]))
 
-    def on_object_double_clicked(self, row, column):
+        self.object_model.append_rows(rows)
+
+    def on_object_double_clicked(self, index):
         """Handle double-clicking on an object"""
-        type_item = self.object_table.item(row, 1)
-        dn_item = self.object_table.item(row, 2)
-        
-        if not type_item or not dn_item:
-            return
-            
-        obj_type = type_item.text()
-        dn = dn_item.text()
+        name, obj_type, dn = self.object_model.row(index.row())
         
         # Open the appropriate editor based on object type
         if obj_type == "User":
@@ -478,29 +842,16 @@ class DirectoryBrowser(QMainWindow):
             self.edit_user_window.show()
         else:
             # For now, just show information about other object types
-            name_item = self.object_table.item(row, 0)
-            name = name_item.text() if name_item else "Unknown"
-            
             info_text = f"Selected {obj_type}:\n\nName: {name}\nDN: {dn}"
             QMessageBox.information(self, f"Edit {obj_type}", info_text)
 
     def on_edit_selected(self):
         """Handle editing of a selected object"""
-        selected_rows = self.object_table.selectedItems()
-        if not selected_rows:
+        selected = self.object_table.selectionModel().selectedIndexes()
+        if not selected:
             return
             
-        row = selected_rows[0].row()
-        name_item = self.object_table.item(row, 0)
-        type_item = self.object_table.item(row, 1)
-        dn_item = self.object_table.item(row, 2)
-        
-        if not all([name_item, type_item, dn_item]):
-            return
-            
-        name = name_item.text()
-        obj_type = type_item.text()
-        dn = dn_item.text()
+        name, obj_type, dn = self.object_model.row(selected[0].row())
         
         # Open the appropriate editor based on object type
         if obj_type == "User":
@@ -520,155 +871,126 @@ class DirectoryBrowser(QMainWindow):
             QMessageBox.information(self, f"Edit {obj_type}", info_text)
 
     def update_button_states(self):
-        self.edit_button.setEnabled(len(self.object_table.selectedItems()) > 0)
+        self.edit_button.setEnabled(self.object_table.selectionModel().hasSelection())
+
+    def on_search_timer(self):
+        """Run the search once typing pauses, ignoring an emptied search box"""
+        if self.search_edit.text().strip():
+            self.perform_search()
 
     def perform_search(self):
+        # Enter or the Search button runs the search now; drop the pending one
+        self.search_timer.stop()
+        
         search_term = self.search_edit.text().strip()
         if not search_term:
             QMessageBox.information(self, "Search", "Please enter a search term")
             return
             
         self.statusbar.showMessage(f"Searching for '{search_term}'...")
-        QApplication.processEvents()
         
-        # Construct search filter for name, sAMAccountName, or CN
-        search_filter = f"(|(cn=*{search_term}*)(sAMAccountName=*{search_term}*)(name=*{search_term}*)(displayName=*{search_term}*))"
+        # Ambiguous Name Resolution matches name, sAMAccountName, displayName
+        # and other indexed naming attributes server-side. The substring filter
+        # can't use indexes, so it only runs if ANR finds nothing.
+        safe_term = escape_filter_chars(search_term)
+        anr_filter = f"(anr={safe_term})"
+        substring_filter = f"(|(cn=*{safe_term}*)(sAMAccountName=*{safe_term}*)(name=*{safe_term}*)(displayName=*{safe_term}*))"
+        base_dn = self.base_dn
         
-        try:
-            self.conn.search(search_base=self.base_dn, search_filter=search_filter,
-                           search_scope=SUBTREE,
-                           attributes=["displayName", "cn", "sAMAccountName", "objectCategory", "distinguishedName"])
-        except LDAPException as e:
+        def run(search_filter):
+            # Stop paging one past the limit so broad terms don't pull the whole directory
+            return self.cached_search(base_dn, search_filter,
+                                      ["displayName", "cn", "sAMAccountName", "objectCategory"],
+                                      limit=SEARCH_RESULT_LIMIT + 1)
+        
+        def search():
+            return run(anr_filter) or run(substring_filter)
+        
+        def failed(e):
             QMessageBox.critical(self, "LDAP Error", f"Failed to perform search: {e}")
             self.statusbar.showMessage("Search failed")
-            return
-            
-        entries = self.conn.entries
-        self.search_results_table.setRowCount(0)
         
+        self.run_ldap_task("search", search,
+                           lambda entries: self.populate_search_results(entries, search_term), failed)
+
+    def populate_search_results(self, entries, search_term):
+        """
+        Fill the search results table and switch to its tab
+        
+        Args:
+            entries: Search response entries returned by the search
+            search_term: Text that was searched for, for the results label
+        """
+        truncated = len(entries) > SEARCH_RESULT_LIMIT
+        entries = entries[:SEARCH_RESULT_LIMIT]
+        
+        rows = []
         for entry in entries:
-            row = self.search_results_table.rowCount()
-            self.search_results_table.insertRow(row)
+            attrs = entry["attributes"]
             
             # Use displayName for name column
-            name = entry.displayName.value if hasattr(entry, "displayName") and entry.displayName.value else ""
-            if not name:
-                name = entry.cn.value if hasattr(entry, "cn") else ""
+            name = first_value(attrs, "displayName") or first_value(attrs, "cn") or ""
                 
             # Get SAM account name (keep this for the sam column)
-            sam = entry.sAMAccountName.value if hasattr(entry, "sAMAccountName") else ""
+            sam = first_value(attrs, "sAMAccountName") or ""
             
             # Get object type
-            obj_cat = entry.objectCategory.value if hasattr(entry, "objectCategory") else ""
-            if "person" in obj_cat.lower():
-                obj_type = "User"
-            elif "computer" in obj_cat.lower():
-                obj_type = "Computer"
-            elif "group" in obj_cat.lower():
-                obj_type = "Group"
-            else:
-                obj_type = obj_cat.split(",")[0].replace("CN=", "")
+            obj_cat = first_value(attrs, "objectCategory") or ""
+            obj_type = classify_object_category(obj_cat)
                 
             # Get location (OU path)
-            dn = entry.distinguishedName.value if hasattr(entry, "distinguishedName") else ""
-            ou_path = ','.join(dn.split(',')[1:])  # Remove the CN part
-            
-            self.search_results_table.setItem(row, 0, QTableWidgetItem(name))
-            self.search_results_table.setItem(row, 1, QTableWidgetItem(sam))
-            self.search_results_table.setItem(row, 2, QTableWidgetItem(obj_type))
-            self.search_results_table.setItem(row, 3, QTableWidgetItem(ou_path))
+            dn = entry["dn"]
+            _, _, ou_path = dn.partition(",")  # Remove the CN part
             
-        result_count = self.search_results_table.rowCount()
-        self.search_results_label.setText(f"Found {result_count} result{'s' if result_count != 1 else ''} for '{search_term}'")
-        self.statusbar.showMessage(f"Search completed, found {result_count} matches")
+            # Keep the full DN on the row so opening the result needs no lookup
+            rows.append((name, sam, obj_type, ou_path, dn))
+
+        self.search_model.set_rows(rows)
+
+        result_count = len(rows)
+        if truncated:
+            self.search_results_label.setText(
+                f"Showing the first {result_count} results for '{search_term}' - refine your search to see more")
+            self.statusbar.showMessage(f"Search stopped after {result_count} matches")
+        else:
+            self.search_results_label.setText(f"Found {result_count} result{'s' if result_count != 1 else ''} for '{search_term}'")
+            self.statusbar.showMessage(f"Search completed, found {result_count} matches")
         
         # Switch to search results tab
         self.tab_widget.setCurrentIndex(1)
 
-    def on_search_result_double_clicked(self, row, column):
+    def on_search_result_double_clicked(self, index):
         """Handle double-clicking a search result"""
-        type_item = self.search_results_table.item(row, 2)  # Assuming column 2 is type
-        
-        if not type_item:
-            return
-            
-        obj_type = type_item.text()
+        name, sam, obj_type, location, dn = self.search_model.row(index.row())
         
         # For users, open the edit window
         if obj_type == "User":
-            # Get the DN from the search results
-            dn = ""
-            name_item = self.search_results_table.item(row, 0)
-            sam_item = self.search_results_table.item(row, 1)
-            location_item = self.search_results_table.item(row, 3)
-            
-            if location_item:
-                # We need to find the actual DN for this object by doing a search
-                name = name_item.text() if name_item else ""
-                sam = sam_item.text() if sam_item else ""
-                
-                # Use SAM account for searching as it's more reliable
-                if sam:
-                    search_filter = f"(sAMAccountName={sam})"
-                elif name:
-                    search_filter = f"(displayName={name})"
-                else:
-                    return
-                    
-                try:
-                    self.conn.search(
-                        search_base=self.base_dn,
-                        search_filter=search_filter,
-                        search_scope=SUBTREE,
-                        attributes=["distinguishedName"]
-                    )
-                    
-                    if self.conn.entries and hasattr(self.conn.entries[0], "distinguishedName"):
-                        dn = self.conn.entries[0].distinguishedName.value
-                        
-                        # Now we have the DN, open the edit window with the new UserWindow
-                        self.edit_user_window = UserWindow(
-                            ldap_conn=self.conn,
-                            mode=UserOperation.EDIT,
-                            user_dn=dn,
-                            current_domain=self.connected_domain,
-                            domains=self.domains
-                        )
-                        self.edit_user_window.user_action_completed.connect(self.refresh_view)
-                        self.edit_user_window.show()
-                    else:
-                        QMessageBox.warning(self, "Object Not Found", "Could not find the object's distinguished name.")
-                        
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to get object details: {e}")
+            if dn:
+                self.edit_user_window = UserWindow(
+                    ldap_conn=self.conn,
+                    mode=UserOperation.EDIT,
+                    user_dn=dn,
+                    current_domain=self.connected_domain,
+                    domains=self.domains
+                )
+                self.edit_user_window.user_action_completed.connect(self.refresh_view)
+                self.edit_user_window.show()
+            else:
+                QMessageBox.warning(self, "Object Not Found", "Could not find the object's distinguished name.")
         else:
             # For non-user objects
-            name_item = self.search_results_table.item(row, 0)
-            name = name_item.text() if name_item else "Unknown"
-            
             QMessageBox.information(self, f"{obj_type} Details", f"Details for {name}")
 
     def on_create_new_user(self):
         """Handle request to create a new user"""
         # Make sure we have OUs to work with
-        if not hasattr(self, 'ou_items') or not self.ou_items:
+        if not self.ou_items:
             QMessageBox.warning(self, "No OUs", "No organizational units available for user creation.")
             return
             
-        ou_list = []
-        def add_items(item):
-            ou_dn = item.data(0, Qt.ItemDataRole.UserRole)
-            ou_list.append((item.text(0), ou_dn))
-            for i in range(item.childCount()):
-                add_items(item.child(i))
-                
-        for i in range(self.ou_tree.topLevelItemCount()):
-            add_items(self.ou_tree.topLevelItem(i))
-            
-        # If no OUs found, show error
-        if not ou_list:
-            QMessageBox.warning(self, "No OUs", "No organizational units available for user creation.")
-            return
+        # Every OU loaded into the tree so far, shallowest first
+        ou_list = [(item.text(0), dn) for dn, item in self.ou_items.items()]
+        ou_list.sort(key=lambda ou: ou[1].count(","))
             
         # Create the new user window with our new UserWindow in CREATE mode
         self.create_user_window = UserWindow(
@@ -681,77 +1003,52 @@ class DirectoryBrowser(QMainWindow):
         self.create_user_window.user_action_completed.connect(self.on_user_created)
         self.create_user_window.show()
 
-    def on_user_created(self):
-        """Called when a user is created or updated"""
-        # Refresh the current view after user creation/update
-        self.refresh_view()
+    def on_user_created(self, dn):
+        """
+        Called when a user is created or updated
+        
+        Args:
+            dn: DN of the created user
+        """
+        # Refresh the user's OU after user creation/update
+        self.refresh_view(dn)
         self.statusbar.showMessage("User operation completed successfully")
 
-    def on_search_result_double_clicked(self, row, column):
-        """Handle double-clicking a search result"""
-        type_item = self.search_results_table.item(row, 2)  # Assuming column 2 is type
+    def refresh_view(self, dn=""):
+        """
+        Refresh the current view
         
-        if not type_item:
-            return
+        Args:
+            dn: DN of a single object that changed. Only the OU containing it
+                is re-read; when empty the whole OU tree is reloaded.
+        """
+        if dn:
+            parent_dn = ",".join(to_dn(dn)[1:]).lower()
             
-        obj_type = type_item.text()
-        
-        # For users, open the edit window
-        if obj_type == "User":
-            # Get the DN from the search results
-            dn = ""
-            name_item = self.search_results_table.item(row, 0)
-            sam_item = self.search_results_table.item(row, 1)
-            location_item = self.search_results_table.item(row, 3)
+            # Forget listings of the object's OU and any free-text searches,
+            # which may include it; the OU tree itself hasn't changed
+            with self.search_cache_lock:
+                self.search_cache_generation += 1
+                stale = [key for key in self.search_cache
+                         if key[0].lower() == parent_dn or key[3] == SUBTREE]
+                for key in stale:
+                    del self.search_cache[key]
             
-            if location_item:
-                # We need to find the actual DN for this object by doing a search
-                name = name_item.text() if name_item else ""
-                sam = sam_item.text() if sam_item else ""
-                
-                # Use SAM account for searching as it's more reliable
-                if sam:
-                    search_filter = f"(sAMAccountName={sam})"
-                elif name:
-                    search_filter = f"(displayName={name})"
-                else:
-                    return
-                    
-                try:
-                    self.conn.search(
-                        search_base=self.base_dn,
-                        search_filter=search_filter,
-                        search_scope=SUBTREE,
-                        attributes=["distinguishedName"]
-                    )
-                    
-                    if self.conn.entries and hasattr(self.conn.entries[0], "distinguishedName"):
-                        dn = self.conn.entries[0].distinguishedName.value
-                        
-                        # Now we have the DN, open the edit window with the new UserWindow
-                        self.edit_user_window = UserWindow(
-                            ldap_conn=self.conn,
-                            mode=UserOperation.EDIT,
-                            user_dn=dn,
-                            current_domain=self.connected_domain,
-                            domains=self.domains
-                        )
-                        self.edit_user_window.user_action_completed.connect(self.refresh_view)
-                        self.edit_user_window.show()
-                    else:
-                        QMessageBox.warning(self, "Object Not Found", "Could not find the object's distinguished name.")
-                        
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Failed to get object details: {e}")
-        else:
-            # For non-user objects
-            name_item = self.search_results_table.item(row, 0)
-            name = name_item.text() if name_item else "Unknown"
+            # Only the object table for that OU needs re-reading, if it's showing
+            selected_items = self.ou_tree.selectedItems()
+            if selected_items:
+                selected_dn = selected_items[0].data(0, Qt.ItemDataRole.UserRole) or ""
+                if selected_dn.lower() == parent_dn:
+                    self.on_ou_selected(selected_items[0], 0)
             
-            QMessageBox.information(self, f"{obj_type} Details", f"Details for {name}")
-
-    def refresh_view(self):
-        """Refresh the current view"""
+            self.statusbar.showMessage("View refreshed")
+            return
+        
+        # Refresh means re-read the directory, not the cache
+        with self.search_cache_lock:
+            self.search_cache_generation += 1
+            self.search_cache.clear()
+        
         # Reload OUs first
         self.load_ous()
         
@@ -764,8 +1061,18 @@ class DirectoryBrowser(QMainWindow):
 
     def closeEvent(self, event):
         """Handle window close event"""
-        if self.conn:
-            self.conn.unbind()
+        # Drop pending results; their widgets are going away
+        self.ldap_tasks.clear()
+        # Wait for any in-flight call before closing the shared connections
+        self.conn_lock.lock()
+        try:
+            for _, conn, _ in self.connections.values():
+                # Close its pool, and the user editor's write connection with it
+                close_connection_pool(conn)
+                conn.unbind()
+            self.connections.clear()
+        finally:
+            self.conn_lock.unlock()
         event.accept()
 
 
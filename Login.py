@@ -9,14 +9,15 @@ from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton, QComboBox,
     QVBoxLayout, QHBoxLayout, QMessageBox, QGroupBox, QCheckBox
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QThreadPool
 from PyQt6.QtGui import QFont
-from ldap3 import Server, Connection, ALL, Tls, SUBTREE
+from ldap3 import Server, ServerPool, Connection, NONE, FIRST, Tls, SUBTREE
 from ldap3.core.exceptions import LDAPException
+from ldap3.utils.conv import escape_filter_chars
 
 # Import will be used when running as part of the application
 try:
-    from helpers import domain_to_base_dn, get_app_stylesheet
+    from helpers import domain_to_base_dn, get_app_stylesheet, LdapWorker
 except ImportError:
     # Define these here for standalone testing
     def domain_to_base_dn(domain: str) -> str:
@@ -24,8 +25,7 @@ except ImportError:
         Convert a full DNS domain (e.g., 'corp.adenshomelab.xyz') into a base DN.
         E.g., 'corp.adenshomelab.xyz' -> 'DC=corp,DC=adenshomelab,DC=xyz'
         """
-        parts = domain.split('.')
-        return ','.join(f"DC={part}" for part in parts)
+        return "DC=" + domain.replace(".", ",DC=")
     
     def get_app_stylesheet():
         """Returns the application's stylesheet for a modern look"""
@@ -59,9 +59,44 @@ DOMAIN_CONFIG = {
 # Default domain to select in the UI
 DEFAULT_DOMAIN = "CORP"
 
+# Reverse lookup: lowercased DC FQDN -> (domain FQDN, that domain's DCs)
+DC_TO_DOMAIN = {dc.lower(): (fqdn, dc_list) for fqdn, dc_list in DOMAIN_CONFIG.values() for dc in dc_list}
+
+# TLS settings shared by every LDAPS connection; PROTOCOL_TLS_CLIENT lets
+# OpenSSL negotiate TLS 1.3 where the DC supports it
+_TLS = Tls(validate=ssl.CERT_REQUIRED, version=ssl.PROTOCOL_TLS_CLIENT, ciphers='HIGH:!aNULL:!MD5')
+
+# LDAP_MATCHING_RULE_IN_CHAIN: matches nested group membership server-side
+IN_CHAIN = "1.2.840.113556.1.4.1941"
+
+# Login filters; fill in with escaped values via .format()
+USER_FILTER = "(sAMAccountName={username})"
+# The user, if a (nested) member of Domain Admins of their own domain or of
+# Enterprise Admins, which lives in the forest root - any configured domain
+# may be the root, so each gets a clause. Unlike the old memberOf scan, which
+# accepted direct membership of any group named Domain Admins or Enterprise
+# Admins, this also admits members through nested groups and only accepts
+# the Domain Admins group of the domain being logged in to.
+ADMIN_FILTER = (
+    "(&" + USER_FILTER + "(|"
+    f"(memberOf:{IN_CHAIN}:=CN=Domain Admins,CN=Users,{{base_dn}})"
+    + "".join(f"(memberOf:{IN_CHAIN}:=CN=Enterprise Admins,CN=Users,{domain_to_base_dn(fqdn)})"
+              for fqdn, _ in DOMAIN_CONFIG.values())
+    + "))"
+)
+
 # ========================================================
 
 
+class LoginFailed(Exception):
+    """A login step failed; carries the text for the error dialog and status line"""
+    def __init__(self, title, message, status):
+        super().__init__(message)
+        self.title = title
+        self.message = message
+        self.status = status
+
+
 class LoginWindow(QWidget):
     def __init__(self):
         super().__init__()
@@ -225,8 +260,11 @@ class LoginWindow(QWidget):
 
     def login(self):
         """Authenticate and log in to the selected domain"""
+        if not self.login_button.isEnabled():
+            # A login is already in progress (Enter in the password field)
+            return
+            
         self.status_label.setText("Connecting...")
-        QApplication.processEvents()
         
         # Get selected domain NetBIOS name
         domain_idx = self.domain_combo.currentIndex()
@@ -279,11 +317,8 @@ class LoginWindow(QWidget):
 
         # Cross-domain authentication usually requires Global Catalog
         # Determine if we're doing cross-domain authentication
-        dc_domain = ""
-        for netbios, (fqdn, dc_list) in DOMAIN_CONFIG.items():
-            if dc_fqdn in dc_list:
-                dc_domain = fqdn
-                break
+        dc_domain, dc_list = DC_TO_DOMAIN.get(dc_fqdn.lower(), ("", []))
+        dc_peers = [dc for dc in dc_list if dc.lower() != dc_fqdn.lower()]
                 
         # If DC belongs to a different domain than the user, use Global Catalog port
         if dc_domain and dc_domain.lower() != domain_fqdn.lower():
@@ -291,72 +326,98 @@ class LoginWindow(QWidget):
         else:
             port = 636   # Regular LDAP port
 
-        tls_config = Tls(validate=ssl.CERT_REQUIRED, version=ssl.PROTOCOL_TLSv1_2)
+        # Determine base DN for searching; server info isn't read at bind
+        base_dn_for_admin = domain_to_base_dn(domain_fqdn)
+        
+        user_filter = USER_FILTER.format(username=escape_filter_chars(username))
+        admin_filter = ADMIN_FILTER.format(username=escape_filter_chars(username),
+                                           base_dn=escape_filter_chars(base_dn_for_admin))
 
-        try:
-            server = Server(f"ldaps://{dc_fqdn}", port=port, tls=tls_config, get_info=ALL)
-        except Exception as e:
-            QMessageBox.critical(self, "Server Error", f"Failed to create LDAP server object:\n{e}")
-            self.status_label.setText("Connection error")
-            return
+        def authenticate():
+            # Runs on a worker thread: no widgets in here
+            try:
+                # Try the selected DC first, then fall back to the other DCs of
+                # the same domain if it can't be reached
+                server_pool = ServerPool(
+                    [Server(f"ldaps://{dc}", port=port, tls=_TLS, get_info=NONE) for dc in [dc_fqdn] + dc_peers],
+                    FIRST, active=1, exhaust=True)
+            except Exception as e:
+                raise LoginFailed("Server Error", f"Failed to create LDAP server object:\n{e}", "Connection error")
 
-        try:
-            conn = Connection(server, user=bind_user, password=password, auto_bind=True)
-        except LDAPException as e:
-            QMessageBox.critical(self, "Authentication Failed", f"Failed to bind to AD:\n{e}")
-            self.status_label.setText("Authentication failed")
-            return
+            try:
+                conn = Connection(server_pool, user=bind_user, password=password, auto_bind=True)
+            except LDAPException as e:
+                raise LoginFailed("Authentication Failed", f"Failed to bind to AD:\n{e}", "Authentication failed")
 
-        # Determine base DN for searching
-        try:
-            base_dn_for_admin = server.info.naming_contexts[0]
-        except Exception:
-            base_dn_for_admin = domain_to_base_dn(domain_fqdn)
+            is_admin = False
+            try:
+                try:
+                    # For cross-domain searches, we might need to specify the domain in the search
+                    if port == 3269:  # Global Catalog
+                        # Empty base for Global Catalog searches
+                        search_base = ""
+                    else:
+                        search_base = base_dn_for_admin
+                        
+                    # Let the server evaluate (nested) admin group membership
+                    # instead of pulling the user's whole memberOf list
+                    conn.search(search_base=search_base, search_filter=admin_filter,
+                                attributes=['1.1'], size_limit=1)
+                    is_admin = bool(conn.entries)
+                    
+                    if not is_admin:
+                        # Tell "not an admin" apart from "no such user"
+                        conn.search(search_base=search_base, search_filter=user_filter,
+                                    attributes=['1.1'], size_limit=1)
+                except LDAPException as e:
+                    raise LoginFailed("Search Error", f"LDAP search failed:\n{e}", "Search error")
 
-        # Check if user exists and get groups
-        search_filter = f"(sAMAccountName={username})"
-        try:
-            # For cross-domain searches, we might need to specify the domain in the search
-            if port == 3269:  # Global Catalog
-                # Empty base for Global Catalog searches
-                search_base = ""
-            else:
-                search_base = base_dn_for_admin
+                if not is_admin and not conn.entries:
+                    raise LoginFailed("User Not Found", "User not found in Active Directory.", "User not found")
                 
-            conn.search(search_base=search_base, search_filter=search_filter, attributes=['memberOf'])
-        except LDAPException as e:
-            QMessageBox.critical(self, "Search Error", f"LDAP search failed:\n{e}")
-            conn.unbind()
-            self.status_label.setText("Search error")
-            return
+                # The browser takes over the bound connection to whichever DC answered
+                return conn, is_admin
+            finally:
+                if not is_admin:
+                    conn.unbind()
 
-        if not conn.entries:
-            QMessageBox.critical(self, "User Not Found", "User not found in Active Directory.")
-            conn.unbind()
-            self.status_label.setText("User not found")
-            return
+        def authenticated(result):
+            conn, is_admin = result
+            if is_admin:
+                self.status_label.setText(f"Authentication successful for {display_username}")
+                QTimer.singleShot(500, lambda: self.open_browser_window(
+                    domain_netbios, domain_fqdn, username, password, 
+                    conn.server.host, base_dn_for_admin, port, conn))
+            else:
+                QMessageBox.critical(self, "Authorization Failed", 
+                                    f"User {display_username} is not a member of Domain Admins or Enterprise Admins.")
+                self.status_label.setText("Authorization failed")
+                self.login_button.setEnabled(True)
 
-        # Check if user is in admin groups
-        entry = conn.entries[0]
-        groups = entry.memberOf.values if 'memberOf' in entry else []
-        is_admin = any("CN=Domain Admins" in g or "CN=Enterprise Admins" in g for g in groups)
-        conn.unbind()
+        def failed(e):
+            self.login_button.setEnabled(True)
+            if isinstance(e, LoginFailed):
+                QMessageBox.critical(self, e.title, e.message)
+                self.status_label.setText(e.status)
+            else:
+                QMessageBox.critical(self, "Login Error", f"Login failed:\n{e}")
+                self.status_label.setText("Login failed")
 
-        if is_admin:
-            self.status_label.setText(f"Authentication successful for {display_username}")
-            QTimer.singleShot(500, lambda: self.open_browser_window(
-                domain_netbios, domain_fqdn, username, password, 
-                dc_fqdn, base_dn_for_admin, port))
-        else:
-            QMessageBox.critical(self, "Authorization Failed", 
-                                f"User {display_username} is not a member of Domain Admins or Enterprise Admins.")
-            self.status_label.setText("Authorization failed")
+        # Bind and search off the GUI thread; keep a reference so the
+        # worker's signals outlive this call
+        self.login_button.setEnabled(False)
+        self.login_worker = LdapWorker(authenticate)
+        self.login_worker.signals.finished.connect(authenticated)
+        self.login_worker.signals.error.connect(failed)
+        QThreadPool.globalInstance().start(self.login_worker)
             
-    def open_browser_window(self, login_domain, login_domain_dns, username, password, dc_fqdn, ou_base_dn, port):
+    def open_browser_window(self, login_domain, login_domain_dns, username, password, dc_fqdn, ou_base_dn, port, conn=None):
         # Import DirectoryBrowser here to avoid circular imports
         from DirectoryBrowser import DirectoryBrowser
         
-        self.browser = DirectoryBrowser(login_domain, login_domain_dns, username, password, dc_fqdn, ou_base_dn, port)
+        # Hand over the connection bound during login so the browser doesn't bind again
+        self.browser = DirectoryBrowser(login_domain, login_domain_dns, username, password, dc_fqdn, ou_base_dn, port,
+                                        conn=conn)
         self.browser.show()
         self.close()
 
@@ -3,17 +3,174 @@ User attributes management tab for Active Directory user management
 """
 
 from PyQt6.QtWidgets import (
-    QWidget, QTableWidget, QTableWidgetItem, QHeaderView, QScrollArea, QLabel,
+    QWidget, QTableView, QHeaderView, QLabel,
     QPushButton, QVBoxLayout, QHBoxLayout, QDialog, QLineEdit, QTextEdit,
     QFormLayout, QMessageBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
 from PyQt6.QtGui import QFont
+from ldap3 import SCHEMA
+
+# Longest value shown in the attributes table (characters); the edit
+# dialog shows the whole value
+MAX_DISPLAY_LENGTH = 120
+
+# Common user attributes listed in the Attributes tab, before any the
+# server's schema adds
+COMMON_USER_ATTRIBUTES = (
+    # Basic user attributes
+    'sAMAccountName', 'givenName', 'sn', 'displayName', 'userPrincipalName',
+    'mail', 'proxyAddresses', 'mailNickname', 'name', 'cn',
+    
+    # Contact information
+    'telephoneNumber', 'mobile', 'ipPhone', 'homePhone', 'pager', 'facsimileTelephoneNumber',
+    'otherTelephone', 'otherMobile', 'otherHomePhone', 'otherPager', 'otherFacsimileTelephoneNumber',
+    'info', 'notes',
+    
+    # Address information
+    'streetAddress', 'l', 'st', 'postalCode', 'c', 'co', 'countryCode',
+    'physicalDeliveryOfficeName', 'postOfficeBox',
+    
+    # Job information
+    'title', 'department', 'company', 'description', 'manager',
+    'directReports', 'employeeID', 'employeeNumber', 'employeeType', 
+    'division', 'wWWHomePage', 'url',
+    
+    # Account state and security
+    'userAccountControl', 'accountExpires', 'pwdLastSet', 'lockoutTime',
+    'badPasswordTime', 'badPwdCount', 'logonCount', 'lastLogon', 'lastLogonTimestamp',
+    'userWorkstations', 'scriptPath', 'profilePath', 'homeDrive', 'homeDirectory',
+    'msDS-UserPasswordExpiryTimeComputed', 'whenCreated', 'whenChanged',
+    
+    # Groups and other relationships
+    'memberOf', 'primaryGroupID', 'distinguishedName', 'objectGUID', 
+    'objectSid', 'objectCategory', 'objectClass', 'servicePrincipalName',
+    
+    # Additional useful attributes
+    'extensionAttribute1', 'extensionAttribute2', 'extensionAttribute3', 
+    'extensionAttribute4', 'extensionAttribute5', 'extensionAttribute6',
+    'extensionAttribute7', 'extensionAttribute8', 'extensionAttribute9',
+    'extensionAttribute10', 'extensionAttribute11', 'extensionAttribute12',
+    'extensionAttribute13', 'extensionAttribute14', 'extensionAttribute15',
+    
+    # Exchange attributes
+    'msExchHomeServerName', 'homeMDB', 'homeMTA', 'msExchUserAccountControl',
+    'msExchMailboxGuid', 'msExchArchiveGUID', 'msExchArchiveName',
+    'msExchPoliciesIncluded', 'msExchRecipientTypeDetails',
+    'msExchVersion', 'protocolSettings', 'deliverAndRedirect',
+    
+    # Custom attributes
+    'comment', 'adminDescription', 'adminDisplayName', 'assistant',
+    'personalTitle', 'middleName', 'uid', 'initials', 'preferredLanguage',
+    'generationQualifier', 'otherMailbox'
+)
+
+
+def display_value(value):
+    """
+    Format an attribute value for the attributes table
+    
+    Args:
+        value: Attribute value, or list of values for a multi-valued attribute
+        
+    Returns:
+        Single-line display string, with multiple values separated by "; "
+        and anything past MAX_DISPLAY_LENGTH cut off
+    """
+    if isinstance(value, list):
+        text = "; ".join([str(v) for v in value])
+    else:
+        text = str(value)
+    text = " ".join(text.splitlines())
+    if len(text) > MAX_DISPLAY_LENGTH:
+        text = text[:MAX_DISPLAY_LENGTH - 1] + "\u2026"
+    return text
+
+
+class AttributesModel(QAbstractTableModel):
+    """
+    Table model of attribute names and values.
+    
+    Rows are the attribute names in alphabetical order. Values are read
+    from the attributes dict and formatted the first time the view asks
+    for them, so just the rows on screen are ever formatted, and only once.
+    """
+    
+    def __init__(self, parent=None):
+        """
+        Args:
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self._headers = ["Attribute", "Value"]
+        self._names = []
+        self._values = {}
+        self._display = {}  # Formatted values by attribute name
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            name = self._names[index.row()]
+            if index.column() == 0:
+                return name
+            value = self._values.get(name, "")
+            if value == "":
+                # Most listed attributes are unset; nothing to format or cache
+                return ""
+            text = self._display.get(name)
+            if text is None:
+                text = self._display[name] = display_value(value)
+            return text
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+    
+    def set_attributes(self, values, names):
+        """
+        Replace the table contents
+        
+        Args:
+            values: Dictionary of attribute name:value pairs. The model keeps
+                a reference, so later changes show once value_changed is called.
+            names: Attribute names to list, including ones without a value
+        """
+        self.beginResetModel()
+        self._values = values
+        self._names = sorted(names)
+        self._display = {}
+        self.endResetModel()
+    
+    def attribute_name(self, row):
+        """Return the attribute name shown in a row"""
+        return self._names[row]
+    
+    def value_changed(self, row):
+        """
+        Redraw a row's value after it changed in the attributes dict
+        
+        Args:
+            row: Row of the changed attribute
+        """
+        self._display.pop(self._names[row], None)
+        index = self.index(row, 1)
+        self.dataChanged.emit(index, index)
 
 
 class AttributesTab(QWidget):
     """Tab for displaying and editing LDAP attributes of a user"""
     
+    # User attribute names read from each server's schema, shared by every
+    # tab: {(host, port): [attribute names]}
+    schema_cache = {}
+    
     def __init__(self, parent=None, ldap_conn=None, base_dn=None):
         """
         Initialize the attributes tab
@@ -27,6 +184,7 @@ class AttributesTab(QWidget):
         self.ldap_conn = ldap_conn
         self.base_dn = base_dn
         self.custom_attributes = {}
+        self.edit_dialog = None  # Built the first time an attribute is edited
         self.setup_ui()
         
     def setup_ui(self):
@@ -34,20 +192,20 @@ class AttributesTab(QWidget):
         layout = QVBoxLayout(self)
         
         # Add a table to display all attributes
-        self.attributes_table = QTableWidget()
-        self.attributes_table.setColumnCount(2)
-        self.attributes_table.setHorizontalHeaderLabels(["Attribute", "Value"])
+        self.attributes_model = AttributesModel(self)
+        self.attributes_table = QTableView()
+        self.attributes_table.setModel(self.attributes_model)
         self.attributes_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
         self.attributes_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        # Every row is one line high, so the view never measures row content
         self.attributes_table.verticalHeader().setDefaultSectionSize(45)  # Taller rows
+        self.attributes_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.attributes_table.setAlternatingRowColors(True)
-        self.attributes_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.attributes_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         
-        # Make the attributes table scrollable
-        scroll_area = QScrollArea()
-        scroll_area.setWidget(self.attributes_table)
-        scroll_area.setWidgetResizable(True)
-        layout.addWidget(scroll_area)
+        # The view scrolls itself and only lays out the rows in sight; a
+        # scroll area around it would make it lay out every row
+        layout.addWidget(self.attributes_table)
         
         # Add buttons for editing attributes
         button_layout = QHBoxLayout()
@@ -92,56 +250,90 @@ class AttributesTab(QWidget):
         Args:
             schema_attrs: Optional list of schema attributes to include
         """
-        self.attributes_table.setRowCount(0)
-        
         # Use provided schema attributes or current custom attributes
         if schema_attrs is None:
-            schema_attrs = list(self.custom_attributes.keys())
-            
-        # Sort attributes alphabetically for easier viewing
-        schema_attrs = sorted(schema_attrs)
+            schema_attrs = self.custom_attributes.keys()
         
-        for attr_name in schema_attrs:
-            row = self.attributes_table.rowCount()
-            self.attributes_table.insertRow(row)
-            
-            # Add attribute name
-            self.attributes_table.setItem(row, 0, QTableWidgetItem(attr_name))
-            
-            # Add attribute value
-            value = self.custom_attributes.get(attr_name, "")
-            if isinstance(value, list):
-                # For multi-valued attributes, join with newlines
-                display_value = "\n".join(str(v) for v in value) if value else ""
-            else:
-                display_value = str(value)
-                
-            value_item = QTableWidgetItem(display_value)
-            self.attributes_table.setItem(row, 1, value_item)
-            
-            # Adjust row height based on content
-            if "\n" in display_value:
-                # Count newlines and set appropriate height
-                line_count = display_value.count("\n") + 1
-                # Set a minimum of 30 pixels per line, max 5 lines visible at once
-                height = min(line_count, 5) * 30
-                self.attributes_table.setRowHeight(row, height)
+        # The model sorts the attributes alphabetically for easier viewing
+        self.attributes_model.set_attributes(self.custom_attributes, schema_attrs)
+    
+    def selected_row(self):
+        """
+        Get the row selected in the attributes table
+        
+        Returns:
+            Row number, or None if nothing is selected
+        """
+        # The current row, as long as it is still selected
+        row = self.attributes_table.currentIndex().row()
+        if row < 0 or not self.attributes_table.selectionModel().isRowSelected(row):
+            return None
+        return row
     
     def edit_attribute(self):
         """Edit the selected attribute"""
-        selected_items = self.attributes_table.selectedItems()
-        if not selected_items:
+        row = self.selected_row()
+        if row is None:
             QMessageBox.warning(self, "No Selection", "Please select an attribute to edit")
             return
         
         # Get the attribute name
-        row = selected_items[0].row()
-        attr_name = self.attributes_table.item(row, 0).text()
+        attr_name = self.attributes_model.attribute_name(row)
         current_value = self.custom_attributes.get(attr_name, "")
         
-        # Create a dialog for editing
-        dialog = QDialog(self)
+        # Reuse the edit dialog, showing the editor that suits the value
+        dialog = self.get_edit_dialog()
         dialog.setWindowTitle(f"Edit Attribute: {attr_name}")
+        self.edit_label.setText(f"Editing attribute: {attr_name}")
+        multi_valued = isinstance(current_value, list)
+        if multi_valued:
+            self.edit_text.setPlainText("\n".join([str(v) for v in current_value]))
+        else:
+            self.edit_line.setText(str(current_value))
+        self.edit_text.setVisible(multi_valued)
+        self.edit_line.setVisible(not multi_valued)
+        (self.edit_text if multi_valued else self.edit_line).setFocus()
+        
+        # Show dialog
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            # Update the attribute
+            if multi_valued:
+                # Multi-valued attribute - one value per line, each stripped
+                # once, dropping the empty ones
+                new_value = [v for v in (line.strip() for line in self.edit_text.toPlainText().splitlines()) if v]
+                if new_value:
+                    self.custom_attributes[attr_name] = new_value
+                else:
+                    # If empty list, remove the attribute
+                    if attr_name in self.custom_attributes:
+                        del self.custom_attributes[attr_name]
+            else:
+                # Single-valued attribute
+                new_value = self.edit_line.text().strip()
+                if new_value:
+                    self.custom_attributes[attr_name] = new_value
+                else:
+                    # If empty string, remove the attribute
+                    if attr_name in self.custom_attributes:
+                        del self.custom_attributes[attr_name]
+            
+            # Update the table
+            self.attributes_model.value_changed(row)
+    
+    def get_edit_dialog(self):
+        """
+        Get the attribute edit dialog, building it on first use
+        
+        The dialog holds a line edit for single values and a text edit for
+        multi-valued attributes; edit_attribute shows whichever one applies.
+        
+        Returns:
+            QDialog instance
+        """
+        if self.edit_dialog is not None:
+            return self.edit_dialog
+        
+        dialog = QDialog(self)
         dialog.setMinimumWidth(550)  # Wider dialog
         dialog.setMinimumHeight(350)  # Taller dialog
         
@@ -150,27 +342,26 @@ class AttributesTab(QWidget):
         layout.setSpacing(15)  # More space between elements
         
         # Add description label
-        desc_label = QLabel(f"Editing attribute: {attr_name}")
+        self.edit_label = QLabel()
         desc_font = QFont()
         desc_font.setBold(True)
         desc_font.setPointSize(11)
-        desc_label.setFont(desc_font)
-        layout.addWidget(desc_label)
-        
-        # Add input field based on attribute type
-        if isinstance(current_value, list):
-            # Multi-valued attribute
-            value_edit = QTextEdit()
-            value_edit.setMinimumHeight(200)  # Larger text edit area
-            value_edit.setFont(QFont("Courier New", 10))  # Monospaced font
-            value_edit.setPlainText("\n".join(str(v) for v in current_value))
-        else:
-            # Single-valued attribute
-            value_edit = QLineEdit(str(current_value))
-            value_edit.setMinimumHeight(30)  # Taller line edit
-            value_edit.setFont(QFont("Courier New", 10))  # Monospaced font
+        self.edit_label.setFont(desc_font)
+        layout.addWidget(self.edit_label)
         
-        layout.addWidget(value_edit)
+        mono_font = QFont("Courier New", 10)  # Monospaced font
+        
+        # Multi-valued attributes
+        self.edit_text = QTextEdit()
+        self.edit_text.setMinimumHeight(200)  # Larger text edit area
+        self.edit_text.setFont(mono_font)
+        layout.addWidget(self.edit_text)
+        
+        # Single-valued attributes
+        self.edit_line = QLineEdit()
+        self.edit_line.setMinimumHeight(30)  # Taller line edit
+        self.edit_line.setFont(mono_font)
+        layout.addWidget(self.edit_line)
         
         # Add buttons
         button_layout = QHBoxLayout()
@@ -190,131 +381,78 @@ class AttributesTab(QWidget):
         layout.addLayout(button_layout)
         
         dialog.setLayout(layout)
-        
-        # Show dialog
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            # Update the attribute
-            if isinstance(current_value, list):
-                # Multi-valued attribute - split by lines
-                new_value = value_edit.toPlainText().split("\n")
-                # Remove empty strings
-                new_value = [v for v in new_value if v.strip()]
-                if new_value:
-                    self.custom_attributes[attr_name] = new_value
-                else:
-                    # If empty list, remove the attribute
-                    if attr_name in self.custom_attributes:
-                        del self.custom_attributes[attr_name]
-            else:
-                # Single-valued attribute
-                new_value = value_edit.text().strip()
-                if new_value:
-                    self.custom_attributes[attr_name] = new_value
-                else:
-                    # If empty string, remove the attribute
-                    if attr_name in self.custom_attributes:
-                        del self.custom_attributes[attr_name]
-            
-            # Update the table
-            if attr_name in self.custom_attributes:
-                value = self.custom_attributes[attr_name]
-                if isinstance(value, list):
-                    display_value = "\n".join(str(v) for v in value)
-                else:
-                    display_value = str(value)
-                    
-                self.attributes_table.item(row, 1).setText(display_value)
-            else:
-                self.attributes_table.item(row, 1).setText("")
+        self.edit_dialog = dialog
+        return dialog
                 
     def clear_attribute(self):
         """Clear the selected attribute value"""
-        selected_items = self.attributes_table.selectedItems()
-        if not selected_items:
+        row = self.selected_row()
+        if row is None:
             QMessageBox.warning(self, "No Selection", "Please select an attribute to clear")
             return
         
         # Get the attribute name
-        row = selected_items[0].row()
-        attr_name = self.attributes_table.item(row, 0).text()
+        attr_name = self.attributes_model.attribute_name(row)
         
         # Remove the attribute from custom attributes
         if attr_name in self.custom_attributes:
             del self.custom_attributes[attr_name]
             
         # Clear the display
-        self.attributes_table.item(row, 1).setText("")
+        self.attributes_model.value_changed(row)
     
     def get_user_schema_attributes(self):
         """
         Get common user attributes for schema
         
+        The list is built once per server and reused by later tabs.
+        
         Returns:
             List of attribute names
         """
-        # This is a comprehensive list of common user attributes
-        schema_attrs = [
-            # Basic user attributes
-            'sAMAccountName', 'givenName', 'sn', 'displayName', 'userPrincipalName',
-            'mail', 'proxyAddresses', 'mailNickname', 'name', 'cn',
-            
-            # Contact information
-            'telephoneNumber', 'mobile', 'ipPhone', 'homePhone', 'pager', 'facsimileTelephoneNumber',
-            'otherTelephone', 'otherMobile', 'otherHomePhone', 'otherPager', 'otherFacsimileTelephoneNumber',
-            'info', 'notes',
-            
-            # Address information
-            'streetAddress', 'l', 'st', 'postalCode', 'c', 'co', 'countryCode',
-            'physicalDeliveryOfficeName', 'postOfficeBox',
-            
-            # Job information
-            'title', 'department', 'company', 'description', 'manager',
-            'directReports', 'employeeID', 'employeeNumber', 'employeeType', 
-            'division', 'wWWHomePage', 'url',
-            
-            # Account state and security
-            'userAccountControl', 'accountExpires', 'pwdLastSet', 'lockoutTime',
-            'badPasswordTime', 'badPwdCount', 'logonCount', 'lastLogon', 'lastLogonTimestamp',
-            'userWorkstations', 'scriptPath', 'profilePath', 'homeDrive', 'homeDirectory',
-            'msDS-UserPasswordExpiryTimeComputed', 'whenCreated', 'whenChanged',
-            
-            # Groups and other relationships
-            'memberOf', 'primaryGroupID', 'distinguishedName', 'objectGUID', 
-            'objectSid', 'objectCategory', 'objectClass', 'servicePrincipalName',
-            
-            # Additional useful attributes
-            'extensionAttribute1', 'extensionAttribute2', 'extensionAttribute3', 
-            'extensionAttribute4', 'extensionAttribute5', 'extensionAttribute6',
-            'extensionAttribute7', 'extensionAttribute8', 'extensionAttribute9',
-            'extensionAttribute10', 'extensionAttribute11', 'extensionAttribute12',
-            'extensionAttribute13', 'extensionAttribute14', 'extensionAttribute15',
-            
-            # Exchange attributes
-            'msExchHomeServerName', 'homeMDB', 'homeMTA', 'msExchUserAccountControl',
-            'msExchMailboxGuid', 'msExchArchiveGUID', 'msExchArchiveName',
-            'msExchPoliciesIncluded', 'msExchRecipientTypeDetails',
-            'msExchVersion', 'protocolSettings', 'deliverAndRedirect',
-            
-            # Custom attributes
-            'comment', 'adminDescription', 'adminDisplayName', 'assistant',
-            'personalTitle', 'middleName', 'uid', 'initials', 'preferredLanguage',
-            'generationQualifier', 'otherMailbox'
-        ]
+        if self.ldap_conn:
+            cache_key = (self.ldap_conn.server.host, self.ldap_conn.server.port)
+            cached = self.schema_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+        
+        schema_attrs = list(COMMON_USER_ATTRIBUTES)
             
         # Try to get schema attributes from the server, if supported
         try:
+            if self.ldap_conn:
+                self._load_schema()
             if self.ldap_conn and hasattr(self.ldap_conn.server, 'schema') and self.ldap_conn.server.schema:
                 schema = self.ldap_conn.server.schema
                 if 'user' in schema.object_classes:
                     # Add all attributes from schema
-                    for attr in schema.object_classes['user'].must_contain:
-                        if attr not in schema_attrs:
-                            schema_attrs.append(attr)
-                    for attr in schema.object_classes['user'].may_contain:
-                        if attr not in schema_attrs:
+                    seen = set(schema_attrs)
+                    user_class = schema.object_classes['user']
+                    for attr in list(user_class.must_contain) + list(user_class.may_contain):
+                        if attr not in seen:
+                            seen.add(attr)
                             schema_attrs.append(attr)
+                # Only a list completed from the schema is worth keeping
+                self.schema_cache[cache_key] = list(schema_attrs)
         except Exception:
             # If schema retrieval fails, use the predefined list
             pass
             
-        return schema_attrs
\ No newline at end of file
+        return schema_attrs
+    
+    def _load_schema(self):
+        """
+        Read the server schema if it wasn't fetched when the connection was bound.
+        The result is cached on the Server object, so this only hits the
+        directory once per server.
+        """
+        server = self.ldap_conn.server
+        if server.schema is not None:
+            return
+        
+        get_info = server.get_info
+        server.get_info = SCHEMA
+        try:
+            server.get_info_from_server(self.ldap_conn)
+        finally:
+            server.get_info = get_info
\ No newline at end of file
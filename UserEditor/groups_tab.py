@@ -2,59 +2,95 @@
 Group membership management tab for Active Directory user management
 """
 
+import re
+from sys import intern
+
 from PyQt6.QtWidgets import (
-    QWidget, QLabel, QLineEdit, QPushButton, QScrollArea, QCheckBox,
+    QWidget, QLabel, QLineEdit, QPushButton, QTreeView, QAbstractItemView,
     QVBoxLayout, QHBoxLayout, QListWidget, QMessageBox, QListWidgetItem
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QThreadPool, QSortFilterProxyModel
+from PyQt6.QtGui import QStandardItemModel, QStandardItem
 from ldap3 import SUBTREE
 
+from helpers import LdapWorker, get_connection_pool
+from .helpers import first_value
 
-class CollapsibleGroupBox(QWidget):
-    """A custom collapsible section that can be expanded/collapsed"""
-    def __init__(self, title, parent=None):
-        super().__init__(parent)
-        self.setLayout(QVBoxLayout())
-        self.layout().setContentsMargins(0, 0, 0, 0)
-        self.layout().setSpacing(0)
-        
-        # Header with toggle button
-        self.header = QWidget()
-        header_layout = QHBoxLayout()
-        header_layout.setContentsMargins(5, 5, 5, 5)
-        self.header.setLayout(header_layout)
-        
-        self.toggle_btn = QPushButton("+")
-        self.toggle_btn.setFixedSize(24, 24)
-        self.toggle_btn.clicked.connect(self.toggle_content)
-        header_layout.addWidget(self.toggle_btn)
-        
-        title_label = QLabel(f"<b>{title}</b>")
-        header_layout.addWidget(title_label)
-        header_layout.addStretch()
-        
-        # Content area
-        self.content = QWidget()
-        self.content_layout = QVBoxLayout()
-        self.content.setLayout(self.content_layout)
-        self.content.setVisible(False)  # Hidden by default
-        
-        # Add widgets to main layout
-        self.layout().addWidget(self.header)
-        self.layout().addWidget(self.content)
-        
-        # Style
-        self.header.setStyleSheet("background-color: #f0f0f0; border: 1px solid #ddd; border-radius: 4px;")
+# Delay after the last keystroke before the group list is filtered (ms)
+FILTER_DEBOUNCE_MS = 150
+
+# Groups fetched per paged search request, and added to the list at a time
+GROUP_PAGE_SIZE = 500
+
+# Attributes read for each group
+GROUP_ATTRIBUTES = ("cn", "description")
+
+# Exact default group names (not partial matches)
+DEFAULT_GROUP_NAMES = frozenset({
+    "Domain Users", "Domain Admins", "Domain Computers", "Domain Controllers",
+    "Schema Admins", "Enterprise Admins", "Group Policy Creator Owners",
+    "Protected Users", "Cert Publishers", "RAS and IAS Servers",
+    "Terminal Server License Servers", "Allowed RODC Password Replication Group",
+    "Denied RODC Password Replication Group", "Read-only Domain Controllers",
+    "Enterprise Read-only Domain Controllers", "Cloneable Domain Controllers",
+    "DnsAdmins", "DnsUpdateProxy", "Administrators", "Users", "Guests",
+    "Print Operators", "Backup Operators", "Replicator", "Remote Desktop Users",
+    "Network Configuration Operators", "Performance Monitor Users",
+    "Performance Log Users", "Distributed COM Users", "IIS_IUSRS",
+    "Cryptographic Operators", "Event Log Readers", "Certificate Service DCOM Access"
+})
+
+# Container paths that indicate default groups
+DEFAULT_CONTAINER_RE = re.compile(
+    r"CN=Builtin,|CN=Users,|OU=Microsoft Exchange Security Groups,", re.IGNORECASE
+)
+
+# Item roles in the groups model: the group info dict, and the text the
+# search box is matched against (name and description)
+GROUP_ROLE = Qt.ItemDataRole.UserRole
+FILTER_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+def fetch_domain_groups(pool, base_dn, report):
+    """
+    Search a domain for its groups, reporting them a page at a time
     
-    def toggle_content(self):
-        """Toggle the visibility of the content section"""
-        is_visible = self.content.isVisible()
-        self.content.setVisible(not is_visible)
-        self.toggle_btn.setText("-" if not is_visible else "+")
+    Runs on a worker thread over a connection checked out of the pool: an
+    ldap3 connection can't be used from two threads at once, and the user
+    window keeps using its own connection.
     
-    def addWidget(self, widget):
-        """Add a widget to the content section"""
-        self.content_layout.addWidget(widget)
+    Args:
+        pool: LdapConnectionPool to take a connection from
+        base_dn: Base DN to search under
+        report: Callable given each page as a list of group info dictionaries
+    """
+    with pool.get() as conn:
+        page = []
+        for entry in conn.extend.standard.paged_search(
+                search_base=base_dn,
+                search_filter="(objectClass=group)",
+                search_scope=SUBTREE,
+                attributes=GROUP_ATTRIBUTES,
+                paged_size=GROUP_PAGE_SIZE,
+                generator=True):
+            if entry.get("type") != "searchResEntry":
+                continue
+            attrs = entry["attributes"]
+            group_name = first_value(attrs, "cn")
+            if not group_name:
+                continue
+            
+            # Interned so repeated loads share one copy of each name and DN
+            page.append({
+                "name": intern(group_name),
+                "dn": intern(entry["dn"]),
+                "description": first_value(attrs, "description") or ""
+            })
+            if len(page) == GROUP_PAGE_SIZE:
+                report(page)
+                page = []
+        if page:
+            report(page)
 
 
 class GroupsTab(QWidget):
@@ -72,34 +108,65 @@ class GroupsTab(QWidget):
         super().__init__(parent)
         self.ldap_conn = ldap_conn
         self.base_dn = base_dn
+        self.custom_section = None
         self.default_section = None
+        self.group_worker = None
+        self.filter_text = ""
         self.all_groups = []
-        self.selected_groups = []
-        self.group_checkboxes = {}
+        self.groups_by_name = {}
+        self.selected_groups = set()
+        self.group_dns_by_name = {}
         self.setup_ui()
         
     def setup_ui(self):
         """Setup the UI components"""
         layout = QVBoxLayout(self)
         
+        # Create mode widgets (search, group list, buttons) live in one
+        # container and edit mode widgets in another, so switching modes
+        # shows or hides a single widget
+        self.create_mode_container = QWidget()
+        create_layout = QVBoxLayout(self.create_mode_container)
+        create_layout.setContentsMargins(0, 0, 0, 0)
+        create_layout.setSpacing(10)
+        layout.addWidget(self.create_mode_container)
+        
         # Add a search bar for filtering groups
         search_layout = QHBoxLayout()
         search_label = QLabel("Search Groups:")
         self.search_edit = QLineEdit()
         self.search_edit.setPlaceholderText("Type to filter groups...")
-        self.search_edit.textChanged.connect(self.filter_groups)
+        # Filter once typing pauses rather than on every keystroke
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filter_timer.timeout.connect(self.filter_groups)
+        self.search_edit.textChanged.connect(self.filter_timer.start)
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_edit)
-        layout.addLayout(search_layout)
-        
-        # Create a scroll area for the groups list
-        groups_scroll = QScrollArea()
-        groups_scroll.setWidgetResizable(True)
-        groups_scroll_content = QWidget()
-        self.groups_list_layout = QVBoxLayout(groups_scroll_content)
-        self.groups_list_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        groups_scroll.setWidget(groups_scroll_content)
-        layout.addWidget(groups_scroll)
+        create_layout.addLayout(search_layout)
+        
+        # Groups are checkable items under a "Custom Groups" and a
+        # "Default Domain Groups" section; the view only paints visible rows
+        # and the proxy does the filtering
+        self.groups_model = QStandardItemModel(self)
+        self.groups_model.itemChanged.connect(self.on_group_item_changed)
+        self.groups_proxy = QSortFilterProxyModel(self)
+        self.groups_proxy.setSourceModel(self.groups_model)
+        self.groups_proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.groups_proxy.setFilterKeyColumn(0)
+        self.groups_proxy.setFilterRole(FILTER_ROLE)
+        # Keep a section visible while any of its groups match
+        self.groups_proxy.setRecursiveFilteringEnabled(True)
+        # Groups arrive a page at a time; the proxy keeps them sorted by name
+        self.groups_proxy.sort(0)
+        
+        self.groups_view = QTreeView()
+        self.groups_view.setModel(self.groups_proxy)
+        self.groups_view.setHeaderHidden(True)
+        self.groups_view.setUniformRowHeights(True)
+        self.groups_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        create_layout.addWidget(self.groups_view)
         
         # Add a refresh button and selection helpers
         button_layout = QHBoxLayout()
@@ -115,10 +182,12 @@ class GroupsTab(QWidget):
         button_layout.addWidget(self.refresh_btn)
         button_layout.addWidget(self.select_all_btn)
         button_layout.addWidget(self.clear_all_btn)
-        layout.addLayout(button_layout)
+        create_layout.addLayout(button_layout)
         
         # Setup for editing mode
-        self.edit_mode_layout = QVBoxLayout()
+        self.edit_mode_container = QWidget()
+        self.edit_mode_layout = QVBoxLayout(self.edit_mode_container)
+        self.edit_mode_layout.setContentsMargins(0, 0, 0, 0)
         self.list_widget = QListWidget()
         
         self.add_group_btn = QPushButton("Add Group")
@@ -137,6 +206,8 @@ class GroupsTab(QWidget):
         
         # The edit mode widgets are hidden by default
         # They'll be shown when edit mode is activated
+        self.edit_mode_container.setVisible(False)
+        layout.addWidget(self.edit_mode_container)
         
         # Set layout spacing
         layout.setSpacing(10)
@@ -149,7 +220,7 @@ class GroupsTab(QWidget):
         Returns:
             List of selected group names
         """
-        return self.selected_groups.copy()
+        return sorted(self.selected_groups)
     
     def set_selected_groups(self, groups):
         """
@@ -158,10 +229,11 @@ class GroupsTab(QWidget):
         Args:
             groups: List of group names
         """
-        self.selected_groups = groups.copy()
-        # Update checkboxes if they exist
-        for group_name, checkbox in self.group_checkboxes.items():
-            checkbox.setChecked(group_name in self.selected_groups)
+        self.selected_groups = set(groups)
+        # Update loaded group items to match
+        for item in self.group_items():
+            state = Qt.CheckState.Checked if item.text() in self.selected_groups else Qt.CheckState.Unchecked
+            item.setCheckState(state)
     
     def set_edit_mode(self, is_edit_mode, group_dns=None):
         """
@@ -171,235 +243,236 @@ class GroupsTab(QWidget):
             is_edit_mode: True for edit mode, False for create mode
             group_dns: List of group DNs for edit mode
         """
+        self.create_mode_container.setVisible(not is_edit_mode)
+        self.edit_mode_container.setVisible(is_edit_mode)
+        
         if is_edit_mode:
-            # Hide create mode widgets
-            for i in reversed(range(self.layout().count())):
-                item = self.layout().itemAt(i)
-                if item and item.widget():
-                    item.widget().setVisible(False)
-            
-            # Add edit mode widgets if not already there
-            if self.edit_mode_layout.parent() is None:
-                self.layout().addLayout(self.edit_mode_layout)
-            
-            # Show edit mode widgets
-            for i in range(self.edit_mode_layout.count()):
-                item = self.edit_mode_layout.itemAt(i)
-                if item and item.widget():
-                    item.widget().setVisible(True)
-            
-            # Populate with group names
-            self.list_widget.clear()
+            # Populate with group names, remembering each name's DN
             self.displayable_groups = []
+            self.group_dns_by_name = {}
             
             if group_dns:
                 # Extract CN part (group name) from each DN
                 for group_dn in group_dns:
-                    if group_dn.startswith('CN='):
-                        group_name = group_dn.split(',')[0].replace('CN=', '')
-                        self.displayable_groups.append(group_name)
-                        self.list_widget.addItem(group_name)
-                    else:
-                        self.displayable_groups.append(group_dn)
-                        self.list_widget.addItem(group_dn)
-        else:
-            # Hide edit mode widgets
-            for i in range(self.edit_mode_layout.count()):
-                item = self.edit_mode_layout.itemAt(i)
-                if item and item.widget():  # Check if item and widget exist
-                    item.widget().setVisible(False)
-            
-            # Show create mode widgets
-            for i in range(self.layout().count() - 1):  # -1 to exclude edit_mode_layout
-                item = self.layout().itemAt(i)
-                if item and item.widget():  # Check if item and widget exist
-                    item.widget().setVisible(True)
+                    head, _, _ = group_dn.partition(',')
+                    attr, _, group_name = head.partition('=')
+                    if attr.upper() != 'CN':
+                        group_name = group_dn
+                    self.displayable_groups.append(group_name)
+                    self.group_dns_by_name[group_name] = group_dn
             
+            # Insert the names in one go rather than one row at a time
+            self.list_widget.clear()
+            self.list_widget.addItems(self.displayable_groups)
+        else:
             # Load domain groups if not already loaded
             if not self.all_groups:
                 QTimer.singleShot(100, self.load_domain_groups)
     
     def load_domain_groups(self):
-        """Load all groups from the current domain"""
+        """
+        Load all groups from the current domain
+        
+        The search runs on a worker thread and groups are added as each page
+        arrives, so the tab stays responsive while a large domain loads.
+        """
         if not self.ldap_conn or not self.base_dn:
             QMessageBox.warning(self, "Error", "No active LDAP connection")
             return
         
-        # Clear existing widgets
-        for i in reversed(range(self.groups_list_layout.count())):
-            widget = self.groups_list_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-        self.group_checkboxes = {}
+        # Clear existing groups
+        self.groups_model.clear()
+        self.custom_section = None
+        self.default_section = None
         self.all_groups = []
+        self.groups_by_name = {}
+        
+        # Search for all groups in the domain; a refresh replaces any load
+        # still in progress
+        self.group_worker = LdapWorker(fetch_domain_groups, get_connection_pool(self.ldap_conn), self.base_dn,
+                                       progress=True)
+        self.group_worker.signals.progress.connect(self.add_group_page)
+        self.group_worker.signals.finished.connect(self.on_groups_loaded)
+        self.group_worker.signals.error.connect(self.on_groups_failed)
+        self.refresh_btn.setEnabled(False)
+        QThreadPool.globalInstance().start(self.group_worker)
+    
+    def is_current_group_load(self):
+        """
+        Check whether the signal being handled comes from the latest group load
         
-        # Define exact default group names (not partial matches)
-        default_group_names = {
-            "Domain Users", "Domain Admins", "Domain Computers", "Domain Controllers",
-            "Schema Admins", "Enterprise Admins", "Group Policy Creator Owners",
-            "Protected Users", "Cert Publishers", "RAS and IAS Servers",
-            "Terminal Server License Servers", "Allowed RODC Password Replication Group",
-            "Denied RODC Password Replication Group", "Read-only Domain Controllers",
-            "Enterprise Read-only Domain Controllers", "Cloneable Domain Controllers",
-            "DnsAdmins", "DnsUpdateProxy", "Administrators", "Users", "Guests",
-            "Print Operators", "Backup Operators", "Replicator", "Remote Desktop Users",
-            "Network Configuration Operators", "Performance Monitor Users",
-            "Performance Log Users", "Distributed COM Users", "IIS_IUSRS",
-            "Cryptographic Operators", "Event Log Readers", "Certificate Service DCOM Access"
-        }
-        
-        # Define container paths that indicate default groups
-        default_containers = [
-            "CN=Builtin,", "CN=Users,", 
-            "OU=Microsoft Exchange Security Groups,"
-        ]
-        
-        try:
-            # Search for all groups in the domain
-            search_filter = "(objectClass=group)"
-            self.ldap_conn.search(
-                search_base=self.base_dn,
-                search_filter=search_filter,
-                search_scope=SUBTREE,
-                attributes=["cn", "distinguishedName", "description", "groupType"]
-            )
-            
-            # Sort groups alphabetically
-            entries = sorted(self.ldap_conn.entries, key=lambda x: x.cn.value if hasattr(x, "cn") else "")
-            
-            # Categorize groups
-            default_groups = []
-            custom_groups = []
+        Returns:
+            True if it does, False if a refresh has replaced that load
+        """
+        return self.group_worker is not None and self.sender() is self.group_worker.signals
+    
+    def add_group_page(self, groups):
+        """
+        Add a page of groups from the worker to the list
+        
+        Args:
+            groups: Group info dictionaries reported by fetch_domain_groups
+        """
+        if not self.is_current_group_load():
+            return
+        
+        # Items for each section, inserted in bulk once the page is read
+        custom_items = []
+        default_items = []
+        for group_info in groups:
+            group_name = group_info["name"]
             
-            for entry in entries:
-                if hasattr(entry, "cn") and hasattr(entry, "distinguishedName"):
-                    group_name = entry.cn.value
-                    group_dn = entry.distinguishedName.value
-                    group_desc = entry.description.value if hasattr(entry, "description") and entry.description.value else ""
-                    
-                    # Create group info dictionary
-                    group_info = {
-                        "name": group_name,
-                        "dn": group_dn,
-                        "description": group_desc
-                    }
-                    
-                    # Check if it's a default group
-                    if group_name in default_group_names or any(
-                        container in group_dn for container in default_containers):
-                        default_groups.append(group_info)
-                    else:
-                        custom_groups.append(group_info)
-                    
-                    self.all_groups.append(group_info)
+            # Check if it's a default group and file its item accordingly
+            item = self.make_group_item(group_info)
+            if group_name in DEFAULT_GROUP_NAMES or DEFAULT_CONTAINER_RE.search(group_info["dn"]):
+                default_items.append(item)
+            else:
+                custom_items.append(item)
             
-            # Add custom groups directly
-            if custom_groups:
-                # Add a label for custom groups
-                custom_label = QLabel("<b>Custom Groups</b>")
-                self.groups_list_layout.addWidget(custom_label)
-                
-                for group_info in custom_groups:
-                    group_name = group_info["name"]
-                    group_desc = group_info["description"]
-                    
-                    # Create checkbox with tooltip
-                    checkbox = QCheckBox(group_name)
-                    if group_desc:
-                        checkbox.setToolTip(group_desc)
-                        
-                    # Check if this group is in selected_groups
-                    checkbox.setChecked(group_name in self.selected_groups)
-                    checkbox.stateChanged.connect(self.update_selected_groups)
-                    
-                    self.groups_list_layout.addWidget(checkbox)
-                    self.group_checkboxes[group_name] = checkbox
-                    
-            # Add default groups in a collapsible section
-            if default_groups:
-                # Create collapsible section for default groups
-                default_section = CollapsibleGroupBox("Default Domain Groups")
-                self.default_section = default_section  # Store reference for filtering
-                
-                for group_info in default_groups:
-                    group_name = group_info["name"]
-                    group_desc = group_info["description"]
-                    
-                    # Create checkbox with tooltip
-                    checkbox = QCheckBox(group_name)
-                    if group_desc:
-                        checkbox.setToolTip(group_desc)
-                        
-                    # Check if this group is in selected_groups
-                    checkbox.setChecked(group_name in self.selected_groups)
-                    checkbox.stateChanged.connect(self.update_selected_groups)
-                    
-                    default_section.addWidget(checkbox)
-                    self.group_checkboxes[group_name] = checkbox
-                    
-                self.groups_list_layout.addWidget(default_section)
-                        
-        except Exception as e:
-            QMessageBox.warning(self, "Error Loading Groups", f"Failed to load domain groups: {e}")
+            self.all_groups.append(group_info)
+            # Name lookup for creating the user's group memberships
+            self.groups_by_name[group_name] = group_info
+        
+        # Custom groups are listed first and expanded, default groups collapsed
+        new_section = False
+        if custom_items:
+            if self.custom_section is None:
+                self.custom_section = self.make_section_item("Custom Groups")
+                self.groups_model.insertRow(0, self.custom_section)
+                new_section = True
+            self.custom_section.appendRows(custom_items)
+        if default_items:
+            if self.default_section is None:
+                self.default_section = self.make_section_item("Default Domain Groups")
+                self.groups_model.appendRow(self.default_section)
+                new_section = True
+            self.default_section.appendRows(default_items)
+        if new_section:
+            self.filter_groups()
     
-    def filter_groups(self):
-        """Filter groups based on search text"""
-        search_text = self.search_edit.text().lower()
+    def on_groups_loaded(self, result):
+        """Called when the group search has finished"""
+        if self.is_current_group_load():
+            self.group_worker = None
+            self.refresh_btn.setEnabled(True)
+    
+    def on_groups_failed(self, error):
+        """
+        Report a failed group search
         
-        # Keep track if we need to expand default groups section
-        show_default_groups = False
-        matching_default_count = 0
+        Args:
+            error: Exception raised by the search
+        """
+        if self.is_current_group_load():
+            self.group_worker = None
+            self.refresh_btn.setEnabled(True)
+            QMessageBox.warning(self, "Error Loading Groups", f"Failed to load domain groups: {error}")
+    
+    def make_section_item(self, title):
+        """
+        Build an empty section item for the groups list
         
-        # Process all checkboxes
-        for group_name, checkbox in self.group_checkboxes.items():
-            # Get the group info
-            group_info = next((g for g in self.all_groups if g["name"] == group_name), None)
-            if not group_info:
-                continue
-                
-            group_desc = group_info["description"]
-            
-            # Check if the group matches the search
-            matches = (search_text in group_name.lower() or 
-                      (group_desc and search_text in group_desc.lower()))
+        Args:
+            title: Section heading
             
-            # Set visibility based on search match
-            checkbox.setVisible(matches)
+        Returns:
+            QStandardItem for the section
+        """
+        section = QStandardItem(title)
+        section.setEditable(False)
+        font = section.font()
+        font.setBold(True)
+        section.setFont(font)
+        return section
+    
+    def make_group_item(self, group_info):
+        """
+        Build a checkable item for a group
+        
+        Args:
+            group_info: Group info dictionary
             
-            # Determine if it's in the default section based on parent
-            parent = checkbox.parent()
-            if parent == self.default_section.content:
-                if matches:
-                    show_default_groups = True
-                    matching_default_count += 1
-        
-        # Handle default section visibility
-        if hasattr(self, 'default_section'):
-            if search_text and show_default_groups:
-                self.default_section.toggle_content() if not self.default_section.content.isVisible() else None
-                self.default_section.header.setVisible(True)
-            elif search_text:
-                self.default_section.header.setVisible(False)
-            else:
-                self.default_section.header.setVisible(True)
-                self.default_section.content.setVisible(False)
-                self.default_section.toggle_btn.setText("+")
+        Returns:
+            QStandardItem for the group
+        """
+        group_name = group_info["name"]
+        group_desc = group_info["description"]
+        
+        item = QStandardItem(group_name)
+        item.setEditable(False)
+        item.setCheckable(True)
+        # Check if this group is in selected_groups
+        item.setCheckState(Qt.CheckState.Checked if group_name in self.selected_groups
+                           else Qt.CheckState.Unchecked)
+        if group_desc:
+            item.setToolTip(group_desc)
+        item.setData(group_info, GROUP_ROLE)
+        # The newline keeps a search from matching across name and description
+        item.setData(f"{group_name}\n{group_desc}", FILTER_ROLE)
+        return item
+    
+    def group_items(self):
+        """
+        Iterate over the checkable group items in the model
+        
+        Yields:
+            QStandardItem for each loaded group
+        """
+        for row in range(self.groups_model.rowCount()):
+            section = self.groups_model.item(row)
+            for child_row in range(section.rowCount()):
+                yield section.child(child_row)
+    
+    def reset_sections(self):
+        """Expand the custom groups section and collapse the default one"""
+        for row in range(self.groups_proxy.rowCount()):
+            index = self.groups_proxy.index(row, 0)
+            is_default = (self.default_section is not None and
+                          self.groups_proxy.mapToSource(index) == self.default_section.index())
+            self.groups_view.setExpanded(index, not is_default)
+    
+    def filter_groups(self):
+        """Filter groups based on search text"""
+        search_text = self.search_edit.text()
+        # Re-filtering walks every group; skip it when the text is unchanged,
+        # e.g. after typing and deleting within the debounce delay
+        if search_text != self.filter_text:
+            self.filter_text = search_text
+            self.groups_proxy.setFilterFixedString(search_text)
+        
+        # Show every match while searching; go back to the default layout
+        # once the search is cleared
+        if search_text:
+            self.groups_view.expandAll()
+        else:
+            self.reset_sections()
     
     def toggle_all_groups(self, checked):
         """Select or deselect all visible groups"""
-        for checkbox in self.group_checkboxes.values():
-            if checkbox.isVisible():
-                checkbox.setChecked(checked)
-        
-        self.update_selected_groups()
+        state = Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+        for row in range(self.groups_proxy.rowCount()):
+            section_index = self.groups_proxy.index(row, 0)
+            # Groups in a collapsed section aren't visible
+            if not self.groups_view.isExpanded(section_index):
+                continue
+            for child_row in range(self.groups_proxy.rowCount(section_index)):
+                index = self.groups_proxy.mapToSource(self.groups_proxy.index(child_row, 0, section_index))
+                self.groups_model.itemFromIndex(index).setCheckState(state)
     
-    def update_selected_groups(self):
-        """Update the selected_groups list based on checkboxes"""
-        self.selected_groups = []
+    def on_group_item_changed(self, item):
+        """
+        Keep selected_groups in step with a group item's check state
         
-        for group_name, checkbox in self.group_checkboxes.items():
-            if checkbox.isChecked():
-                self.selected_groups.append(group_name)
+        Args:
+            item: The QStandardItem that changed
+        """
+        if item.data(GROUP_ROLE) is None:
+            return
+        group_name = item.text()
+        if item.checkState() == Qt.CheckState.Checked:
+            self.selected_groups.add(group_name)
+        else:
+            self.selected_groups.discard(group_name)
     
     def add_group(self):
         """
@@ -425,11 +498,7 @@ class GroupsTab(QWidget):
         
         if reply == QMessageBox.StandardButton.Yes:
             # Find the DN for this group
-            group_dn = None
-            for dn in getattr(self, 'groups', []):
-                if dn.startswith(f'CN={group_name},'):
-                    group_dn = dn
-                    break
+            group_dn = self.group_dns_by_name.get(group_name)
                     
             # Update the list
             self.list_widget.takeItem(self.list_widget.row(selected_items[0]))
@@ -454,11 +523,11 @@ class GroupsTab(QWidget):
             List of selected group names
         """
         # Edit mode - use list widget items
-        if hasattr(self, 'list_widget') and self.list_widget.isVisible():
+        if self.edit_mode_container.isVisibleTo(self):
             result = []
             for i in range(self.list_widget.count()):
                 result.append(self.list_widget.item(i).text())
             return result
-        # Create mode - use checkboxes
+        # Create mode - use checked groups
         else:
-            return self.selected_groups
+            return sorted(self.selected_groups)
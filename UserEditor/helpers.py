@@ -7,7 +7,13 @@ import ssl
 import random
 import string
 from enum import Enum, auto
+from functools import lru_cache
 from ldap3 import SUBTREE
+from ldap3.utils.conv import escape_filter_chars
+from helpers import find_existing_sam_accounts, encode_password
+
+# Attribute list for SAM account existence checks: no attributes needed
+NO_ATTRIBUTES = ("1.1",)
 
 
 def domain_to_base_dn(domain: str) -> str:
@@ -21,22 +27,36 @@ def domain_to_base_dn(domain: str) -> str:
     Returns:
         Base DN string
     """
-    parts = domain.split('.')
-    return ','.join(f"DC={part}" for part in parts)
+    return "DC=" + domain.replace(".", ",DC=")
 
 
-def encode_password(password):
+@lru_cache(maxsize=32)
+def get_upn_suffixes(current_domain, domain_fqdns):
     """
-    Encode password for LDAP operations according to AD requirements.
+    Get the UPN suffixes offered for a domain.
+    Results are cached, since every user window asks for the same ones.
     
     Args:
-        password: Plain text password
+        current_domain: FQDN of the domain being managed, or None
+        domain_fqdns: Frozenset of the FQDNs of all known domains
         
     Returns:
-        UTF-16LE encoded password with double quotes
+        Sorted tuple of suffixes such as '@corp.example.com'
     """
-    password = '"{}"'.format(password)
-    return password.encode('utf-16-le')
+    suffixes = {f"@{fqdn}" for fqdn in domain_fqdns if fqdn}
+    
+    if current_domain:
+        suffixes.add(f"@{current_domain}")
+        
+        # Also add organization domain (corp.com from corp.adenshomelab.com)
+        main_domain = '.'.join(current_domain.split('.')[-2:])
+        suffixes.add(f"@{main_domain}")
+    
+    # Add default if needed
+    if not suffixes:
+        suffixes.add("@adenshomelab.com")
+        
+    return tuple(sorted(suffixes))
 
 
 def auto_generate_sam_account(first, last, ldap_conn, max_attempts=5):
@@ -69,8 +89,28 @@ def auto_generate_sam_account(first, last, ldap_conn, max_attempts=5):
     valid_chars = string.ascii_lowercase + string.digits + ".-_"
     candidate = ''.join(c if c in valid_chars else '.' for c in candidate)
     
+    # Look up every name the variations below may try in a single search
+    names = [candidate]
+    for attempt in range(1, max_attempts + 1):
+        names.append(f"{candidate[:19-len(str(attempt))]}{attempt}")
+        if attempt > 2 and len(first) >= 2:
+            suffix = attempt - 2
+            names.append(f"{first[:2]}.{last}"[:20])
+            names.append(f"{first[:2]}.{last[:17-len(str(suffix))]}{suffix}")
+    try:
+        search_base = ldap_conn.server.info.other['defaultNamingContext'][0]
+    except (AttributeError, KeyError, IndexError):
+        return None
+    existing = find_existing_sam_accounts(names, ldap_conn, search_base)
+    if existing is None:
+        # On error, assume the names are taken to be safe
+        return None
+    
+    def is_unique(name):
+        return name.lower() not in existing
+    
     # Check if the candidate name exists
-    if not is_sam_account_unique(ldap_conn, candidate):
+    if not is_unique(candidate):
         # Try some variations
         for attempt in range(1, max_attempts + 1):
             if attempt <= 2:
@@ -80,7 +120,7 @@ def auto_generate_sam_account(first, last, ldap_conn, max_attempts=5):
                 # Try with first two chars of first name
                 if len(first) >= 2:
                     new_candidate = f"{first[:2]}.{last}"[:20]
-                    if not is_sam_account_unique(ldap_conn, new_candidate):
+                    if not is_unique(new_candidate):
                         # Add a number to the two-char version
                         suffix = attempt - 2
                         new_candidate = f"{first[:2]}.{last[:17-len(str(suffix))]}{suffix}"
@@ -88,7 +128,7 @@ def auto_generate_sam_account(first, last, ldap_conn, max_attempts=5):
                     # Fall back to adding more numbers
                     new_candidate = f"{candidate[:19-len(str(attempt))]}{attempt}"
             
-            if is_sam_account_unique(ldap_conn, new_candidate):
+            if is_unique(new_candidate):
                 return new_candidate
         
         # Couldn't find a unique name within the attempt limit
@@ -97,6 +137,23 @@ def auto_generate_sam_account(first, last, ldap_conn, max_attempts=5):
     return candidate
 
 
+def first_value(attrs, name):
+    """
+    Get a single value from a search response's attributes dict.
+    
+    Args:
+        attrs: Attributes dict of a search response entry
+        name: Attribute name
+        
+    Returns:
+        The first value of a multi-valued attribute, or the value itself
+    """
+    value = attrs.get(name)
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
 def is_sam_account_unique(ldap_conn, sam_account):
     """
     Check if a SAM account name is unique in Active Directory.
@@ -113,12 +170,13 @@ def is_sam_account_unique(ldap_conn, sam_account):
     
     try:
         # Search for the account in AD
-        search_filter = f"(sAMAccountName={sam_account})"
+        search_filter = f"(sAMAccountName={escape_filter_chars(sam_account)})"
         ldap_conn.search(
             search_base=ldap_conn.server.info.other['defaultNamingContext'][0],
             search_filter=search_filter,
             search_scope=SUBTREE,
-            attributes=['sAMAccountName']
+            attributes=NO_ATTRIBUTES,  # Existence check only; no attributes needed
+            size_limit=1
         )
         
         # If entries found, account exists
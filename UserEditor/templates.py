@@ -4,11 +4,53 @@ User template management for Active Directory user creation.
 
 import os
 import json
+import time
+import atexit
+import logging
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
 
+# orjson is much faster at (de)serialising large template files; fall back
+# to the standard library when it isn't installed. Both take and return
+# UTF-8 bytes, and orjson's decode errors subclass json.JSONDecodeError.
+# The templates file and journal are compact; exports are indented for
+# people to read.
+try:
+    import orjson
+    
+    dumps = orjson.dumps
+    
+    def dumps_pretty(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    
+    def dumps_line(data):
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    
+    loads = orjson.loads
+except ImportError:
+    def dumps(data):
+        return json.dumps(data, separators=(',', ':')).encode()
+    
+    def dumps_pretty(data):
+        return json.dumps(data, indent=4).encode()
+    
+    def dumps_line(data):
+        return dumps(data) + b"\n"
+    
+    loads = json.loads
+
+# Journal size at which it is folded back into the templates file (bytes)
+JOURNAL_COMPACT_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
 
 class UserTemplate:
     """Class to store user template settings"""
+    # No per-instance __dict__; a template only ever holds these two fields
+    __slots__ = ("name", "settings")
+    
     def __init__(self, name, settings):
         """
         Initialize a user template
@@ -47,7 +89,20 @@ class UserTemplate:
 
 
 class TemplateManager:
-    """Class to manage user templates"""
+    """
+    Class to manage user templates
+    
+    Templates are stored in a JSON file. Individual adds and deletes are
+    appended to a journal file next to it, which is replayed on load and
+    folded into the main file once it grows past JOURNAL_COMPACT_SIZE.
+    """
+    # Templates parsed from each file, shared by every manager using it:
+    # {file_path: ((st_mtime_ns, st_size), {name: template data})}
+    file_cache = {}
+    
+    # Live managers, flushed to disk when the application exits
+    instances = weakref.WeakSet()
+    
     def __init__(self, file_path=None):
         """
         Initialize the template manager
@@ -61,29 +116,258 @@ class TemplateManager:
             self.file_path = os.path.join(home_dir, "ad_user_templates.json")
         else:
             self.file_path = file_path
+        self.journal_path = self.file_path + ".journal"
+        self.batch_depth = 0  # Nesting level of batch() blocks
+        self.dirty = False  # Full save requested inside a batch
+        self.pending = []  # Journal lines held back until a batch ends
+        self.last_saved = None  # JSON bytes last written to file_path
+        self.journal_damaged = False  # Journal has a line cut short by a crash
+        # Templates are kept in their serialised dict form and only wrapped
+        # in a UserTemplate when one is asked for
         self.templates = self.load_templates()
+        if self.journal_damaged:
+            # Start a fresh journal rather than appending after a broken line
+            self.save_templates()
+        self.disk_stamp = self.read_disk_stamp()  # Files as last read or written
+        self.instances.add(self)
         
     def load_templates(self):
         """
-        Load templates from file
+        Load templates from file, including changes recorded in the journal
+        
+        Returns:
+            Dictionary of template data {name: {"name": ..., "settings": ...}}
+        """
+        templates = self.read_templates_file()
+        self.replay_journal(templates)
+        return templates
+    
+    def read_disk_stamp(self):
+        """
+        Get the modification time and size of the templates file and journal
+        
+        Returns:
+            Tuple of ((st_mtime_ns, st_size) or None) for each file
+        """
+        stamp = []
+        for path in (self.file_path, self.journal_path):
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+    
+    def reload_if_changed(self):
+        """
+        Reload the templates if another process has changed their files
+        
+        Returns:
+            True if the templates were reloaded
+        """
+        if self.batch_depth or self.pending:
+            return False
+        stamp = self.read_disk_stamp()
+        if stamp == self.disk_stamp:
+            return False
+        self.templates = self.load_templates()
+        if self.journal_damaged:
+            self.save_templates()
+        self.disk_stamp = self.read_disk_stamp()
+        return True
+    
+    def read_templates_file(self):
+        """
+        Read the main templates file
         
         Returns:
-            Dictionary of templates {name: UserTemplate}
+            Dictionary of template data {name: {"name": ..., "settings": ...}}
         """
         try:
-            with open(self.file_path, 'r') as f:
-                data = json.load(f)
-                return {name: UserTemplate.from_dict(template) 
-                        for name, template in data.items()}
-        except (FileNotFoundError, json.JSONDecodeError):
+            stat = os.stat(self.file_path)
+        except OSError:
             return {}
+        
+        # Reuse the last parse while the file is unchanged; copy the dict so
+        # this manager's changes don't leak into the cache
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self.file_cache.get(self.file_path)
+        if cached and cached[0] == version:
+            return dict(cached[1])
+        
+        try:
+            with open(self.file_path, 'rb') as f:
+                templates = loads(f.read())
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            # Move the unreadable file aside so the next save doesn't
+            # overwrite the only copy of the user's templates
+            corrupt_path = f"{self.file_path}.corrupt.{int(time.time())}"
+            try:
+                os.replace(self.file_path, corrupt_path)
+            except OSError as move_error:
+                # Read-only or locked directory: carry on without templates
+                # rather than failing at startup
+                logger.warning("Templates file %s is corrupt (%s) and could not be moved aside: %s",
+                               self.file_path, e, move_error)
+                return {}
+            logger.warning("Templates file %s is corrupt (%s); moved it to %s",
+                           self.file_path, e, corrupt_path)
+            return {}
+        self.file_cache[self.file_path] = (version, dict(templates))
+        return templates
+    
+    def replay_journal(self, templates):
+        """
+        Apply the changes recorded in the journal
+        
+        Args:
+            templates: Dictionary of template data to update in place
+        """
+        try:
+            with open(self.journal_path, 'rb') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+        
+        for line in lines:
+            try:
+                change = loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash mid-append
+                self.journal_damaged = True
+                continue
+            self.apply_change(templates, change)
+    
+    @staticmethod
+    def apply_change(templates, change):
+        """
+        Apply one journalled change
+        
+        Args:
+            templates: Dictionary of template data to update in place
+            change: {"op": "put", "name": ..., "template": ...} or
+                {"op": "del", "name": ...}
+        """
+        if change["op"] == "put":
+            templates[change["name"]] = change["template"]
+        elif change["op"] == "del":
+            templates.pop(change["name"], None)
             
     def save_templates(self):
-        """Save templates to file"""
-        data = {name: template.to_dict() 
-                for name, template in self.templates.items()}
-        with open(self.file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+        """
+        Write all templates to file and clear the journal, or just note the
+        request inside a batch
+        """
+        if self.batch_depth:
+            self.dirty = True
+            return
+        
+        # Start from the files rather than this manager's copy, so changes
+        # another manager journalled since this one loaded aren't dropped
+        # with the journal; then reapply the changes not yet journalled.
+        # Every change goes through record_change, so this is the full set.
+        templates = self.read_templates_file()
+        self.replay_journal(templates)
+        for line in self.pending:
+            self.apply_change(templates, loads(line))
+        self.templates = templates
+        
+        payload = dumps(self.templates)
+        self.dirty = False
+        # The file will hold every change, including any not yet journalled
+        self.pending = []
+        if payload == self.last_saved and not self.journal_damaged:
+            # Nothing new to write. The file and journal together still hold
+            # these templates, so the journal must stay.
+            self.disk_stamp = self.read_disk_stamp()
+            return
+        
+        # Write a temporary file and swap it in, so a crash mid-write
+        # can't leave a truncated templates file behind
+        tmp_path = self.file_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.file_path)
+        self.last_saved = payload
+        
+        # The file now holds exactly these templates, journal included
+        stat = os.stat(self.file_path)
+        self.file_cache[self.file_path] = ((stat.st_mtime_ns, stat.st_size), dict(self.templates))
+        
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        self.journal_damaged = False
+        self.disk_stamp = self.read_disk_stamp()
+    
+    def flush(self):
+        """
+        Force the templates file and journal out to disk
+        
+        Saves only hand data to the OS; call this at points where the
+        templates must survive a power loss. It also runs at exit.
+        """
+        for path in (self.file_path, self.journal_path):
+            try:
+                # Opened for writing: Windows can't flush a read-only handle
+                fd = os.open(path, os.O_RDWR)
+            except FileNotFoundError:
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+    
+    def record_change(self, change):
+        """
+        Append a change to the journal, or hold it back until a batch ends
+        
+        Args:
+            change: {"op": "put", "name": ..., "template": ...} or
+                {"op": "del", "name": ...}
+        """
+        self.pending.append(dumps_line(change))
+        if not self.batch_depth:
+            self.write_journal()
+    
+    def write_journal(self):
+        """Append pending changes to the journal in one write"""
+        if not self.pending:
+            return
+        with open(self.journal_path, 'ab') as f:
+            f.write(b"".join(self.pending))
+        self.pending = []
+        self.disk_stamp = self.read_disk_stamp()
+        
+        # Fold a large journal back into the templates file
+        if self.disk_stamp[1][1] > JOURNAL_COMPACT_SIZE:
+            self.save_templates()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Group several changes into a single save
+        
+        Changes made inside the block are written once, when the outermost
+        batch exits. Bulk callers should wrap their changes:
+        
+            with manager.batch():
+                for template in new_templates:
+                    manager.add_template(template)
+        """
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if not self.batch_depth:
+                if self.dirty:
+                    self.save_templates()
+                else:
+                    self.write_journal()
             
     def add_template(self, template):
         """
@@ -92,8 +376,9 @@ class TemplateManager:
         Args:
             template: UserTemplate instance
         """
-        self.templates[template.name] = template
-        self.save_templates()
+        template_data = template.to_dict()
+        self.templates[template.name] = template_data
+        self.record_change({"op": "put", "name": template.name, "template": template_data})
         
     def get_template(self, name):
         """
@@ -105,7 +390,8 @@ class TemplateManager:
         Returns:
             UserTemplate instance or None if not found
         """
-        return self.templates.get(name)
+        template_data = self.templates.get(name)
+        return UserTemplate.from_dict(template_data) if template_data is not None else None
         
     def get_template_names(self):
         """
@@ -128,7 +414,7 @@ class TemplateManager:
         """
         if name in self.templates:
             del self.templates[name]
-            self.save_templates()
+            self.record_change({"op": "del", "name": name})
             return True
         return False
     
@@ -139,10 +425,8 @@ class TemplateManager:
         Args:
             file_path: Path to export file
         """
-        data = {name: template.to_dict() 
-                for name, template in self.templates.items()}
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+        with open(file_path, 'wb') as f:
+            f.write(dumps_pretty(self.templates))
     
     def import_templates(self, file_path):
         """
@@ -158,13 +442,45 @@ class TemplateManager:
             Exception if import fails
         """
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                data = loads(f.read())
                 imported = 0
-                for name, template_data in data.items():
-                    self.templates[name] = UserTemplate.from_dict(template_data)
-                    imported += 1
-                self.save_templates()
+                with self.batch():
+                    for name, template_data in data.items():
+                        # Round-trip to check the entry has a name and settings
+                        template_data = UserTemplate.from_dict(template_data).to_dict()
+                        self.templates[name] = template_data
+                        self.record_change({"op": "put", "name": name, "template": template_data})
+                        imported += 1
                 return imported
         except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
-            raise Exception(f"Error importing templates: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error importing templates: {str(e)}")
+
+
+# Manager for the default templates file, created on first use
+default_manager = None
+
+
+def get_template_manager():
+    """
+    Get the TemplateManager for the default templates file
+    
+    Every window shares one manager, so opening a window doesn't reread
+    the templates unless another process has changed them.
+    
+    Returns:
+        TemplateManager instance
+    """
+    global default_manager
+    if default_manager is None:
+        default_manager = TemplateManager()
+    else:
+        default_manager.reload_if_changed()
+    return default_manager
+
+
+@atexit.register
+def flush_templates():
+    """Flush every live TemplateManager to disk at exit"""
+    for manager in list(TemplateManager.instances):
+        manager.flush()
@@ -4,22 +4,158 @@ Main window for Active Directory user management (create or edit).
 
 import sys
 import os
+import bisect
 from PyQt6.QtWidgets import (
     QWidget, QLabel, QLineEdit, QPushButton, QComboBox,
     QVBoxLayout, QHBoxLayout, QMessageBox, QFormLayout, QCheckBox,
     QGroupBox, QTabWidget, QInputDialog, QFileDialog, QDialog, QTextEdit,QListWidget,QApplication
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, QThreadPool, pyqtSignal
 from PyQt6.QtGui import QFont
-from ldap3 import Server, Connection, MODIFY_REPLACE, MODIFY_ADD, MODIFY_DELETE
+from ldap3 import Server, Connection, ASYNC, MODIFY_REPLACE, MODIFY_ADD, MODIFY_DELETE
 from ldap3.core.exceptions import LDAPException
+from ldap3.core.results import RESULT_SUCCESS
 
-from .helpers import domain_to_base_dn, auto_generate_sam_account, encode_password
+from helpers import LdapWorker, get_connection_pool, clear_sam_cache, encode_password
+from .helpers import domain_to_base_dn, auto_generate_sam_account, get_upn_suffixes
 from . import UserOperation
-from .templates import TemplateManager, UserTemplate
+from .templates import UserTemplate, get_template_manager
 from .attributes_tab import AttributesTab
 from .groups_tab import GroupsTab
 
+# Attributes read when opening a user for editing: the ones the edit form
+# shows or tracks. The Attributes tab loads everything else on first use.
+USER_ATTRIBUTES = (
+    'givenName', 'sn', 'displayName', 'mail', 'telephoneNumber', 'mobile',
+    'sAMAccountName', 'userPrincipalName', 'userAccountControl', 'pwdLastSet',
+    'title', 'department', 'company', 'description', 'streetAddress',
+    'l', 'st', 'postalCode', 'c', 'memberOf'
+)
+
+# Attributes kept as lists even when they hold a single value
+LIST_ATTRIBUTES = frozenset(('memberOf',))
+
+# Plain text fields of the form: (widget attribute, label, LDAP attribute).
+# Create mode asks for the first three person and job fields only.
+PERSON_FIELDS = (
+    ('first_name_edit', "First Name:", 'givenName'),
+    ('last_name_edit', "Last Name:", 'sn'),
+    ('display_name_edit', "Display Name:", 'displayName'),
+    ('email_edit', "Email:", 'mail'),
+    ('phone_edit', "Phone:", 'telephoneNumber'),
+    ('mobile_edit', "Mobile:", 'mobile'),
+)
+JOB_FIELDS = (
+    ('job_title_edit', "Job Title:", 'title'),
+    ('department_edit', "Department:", 'department'),
+    ('company_edit', "Company:", 'company'),
+    ('description_edit', "Description:", 'description'),
+)
+ADDRESS_FIELDS = (
+    ('street_edit', "Street Address:", 'streetAddress'),
+    ('city_edit', "City:", 'l'),
+    ('state_edit', "State/Province:", 'st'),
+    ('postal_edit', "Postal Code:", 'postalCode'),
+)
+TEXT_FIELDS = PERSON_FIELDS + JOB_FIELDS + ADDRESS_FIELDS
+# Create mode fields that are only stored when filled in
+OPTIONAL_CREATE_FIELDS = JOB_FIELDS[:3] + ADDRESS_FIELDS
+
+# Attributes edit mode saves from the form, so the Attributes tab's copies
+# of them are ignored
+FORM_ATTRIBUTES = frozenset(attr for _, _, attr in TEXT_FIELDS) | {
+    'userPrincipalName', 'userAccountControl', 'pwdLastSet', 'unicodePwd',
+    'c', 'co', 'countryCode'
+}
+
+# Countries offered in the Country dropdown: (name, ISO code, numeric code),
+# and each ISO code's position in the list
+COUNTRIES = (
+    ("United States", "US", "840"),
+    ("Canada", "CA", "124"),
+    ("United Kingdom", "GB", "826")
+)
+COUNTRY_INDEX = {country_code: i for i, (_, country_code, _) in enumerate(COUNTRIES)}
+
+# userAccountControl flags
+UAC_ACCOUNTDISABLE = 0x2            # ADS_UF_ACCOUNTDISABLE
+UAC_PASSWD_CANT_CHANGE = 0x40       # ADS_UF_PASSWD_CANT_CHANGE
+UAC_NORMAL_ACCOUNT = 0x200          # ADS_UF_NORMAL_ACCOUNT
+UAC_DONT_EXPIRE_PASSWD = 0x10000    # ADS_UF_DONT_EXPIRE_PASSWD
+
+# userAccountControl flags shown as edit mode checkboxes:
+# (checkbox attribute, flag)
+UAC_CHECKBOX_FLAGS = (
+    ('disabled_chk', UAC_ACCOUNTDISABLE),
+    ('pwd_never_expires_chk', UAC_DONT_EXPIRE_PASSWD),
+    ('cannot_change_pwd_chk', UAC_PASSWD_CANT_CHANGE),
+)
+
+# Delay after the last keystroke in a name field before suggesting a
+# username (milliseconds)
+SAM_DEBOUNCE_MS = 250
+
+
+def find_sam_account(pool, first, last):
+    """
+    Generate a unique SAM account name on a worker thread
+    
+    Args:
+        pool: LdapConnectionPool to take a connection from
+        first: First name
+        last: Last name
+        
+    Returns:
+        Tuple of (first, last, unique SAM account name or None)
+    """
+    with pool.get() as conn:
+        return first, last, auto_generate_sam_account(first, last, conn)
+
+
+def get_write_connection(pool):
+    """
+    Get the LDAPS connection used to create users on a pool's DC
+    
+    The connection is asynchronous, so several requests can be sent before
+    waiting for their replies. It is kept on the pool, so it stays open
+    between users and is closed with the pool when the browser closes.
+    
+    Args:
+        pool: LdapConnectionPool to copy the host and credentials from
+        
+    Returns:
+        A bound Connection on port 636, reused while it stays open
+    """
+    write_conn = pool.write_conn
+    if write_conn is None or write_conn.closed or not write_conn.bound:
+        server = Server(pool.server.host, port=636, use_ssl=True)
+        write_conn = Connection(
+            server,
+            user=pool.user,
+            password=pool.password,
+            authentication='SIMPLE',
+            client_strategy=ASYNC,
+            auto_bind=True
+        )
+        pool.write_conn = write_conn
+    return write_conn
+
+
+def discard_write_connection(pool):
+    """
+    Close and forget a pool's write connection, so the next user creation
+    opens a fresh one
+    
+    Args:
+        pool: LdapConnectionPool the write connection was opened for
+    """
+    write_conn, pool.write_conn = pool.write_conn, None
+    if write_conn is not None:
+        try:
+            write_conn.unbind()
+        except Exception:
+            pass
+
 
 class UserWindow(QWidget):
     """
@@ -27,13 +163,15 @@ class UserWindow(QWidget):
     Can be used in either create mode or edit mode.
     """
     # Signal to notify when a user is created or updated
-    user_action_completed = pyqtSignal()
+    user_action_completed = pyqtSignal(str)  # DN of the created or modified user
     
     def __init__(self, ldap_conn, mode=UserOperation.CREATE, user_dn=None, 
                  ou_list=None, current_domain=None, domains=None):
         """Initialize the user window"""
         super().__init__()
         self.ldap_conn = ldap_conn
+        # Reads go through pooled connections, leaving ldap_conn for writes
+        self.connection_pool = get_connection_pool(ldap_conn) if ldap_conn else None
         self.mode = mode
         self.user_dn = user_dn
         self.ou_list = ou_list or []
@@ -41,9 +179,14 @@ class UserWindow(QWidget):
         self.domains = domains or {}
         self.domain_suffixes = self.discover_domain_suffixes()
         self.base_dn = domain_to_base_dn(current_domain) if current_domain else ""
-        self.template_manager = TemplateManager()
+        self.template_manager = get_template_manager()
         self.user_data = {}
-        self.modified_attributes = {}
+        self.all_attributes_loaded = False
+        # The Groups and Attributes tabs are built the first time they're needed
+        self.groups_tab = None
+        self.attributes_tab = None
+        self.modified_attributes = set()  # Names of attributes changed in edit mode
+        self.sam_cache = {}  # Suggested SAM account names by (first, last), lowercased
         
         if self.mode == UserOperation.EDIT:
             self.load_user_data()
@@ -52,27 +195,8 @@ class UserWindow(QWidget):
     
     def discover_domain_suffixes(self):
         """Get UPN suffixes from domain data"""
-        suffixes = []
-        
-        # Add suffixes from domains dictionary
-        for netbios, fqdn in self.domains.items():
-            if fqdn:
-                suffixes.append(f"@{fqdn}")
-                
-        # Add current domain
-        if self.current_domain and f"@{self.current_domain}" not in suffixes:
-            suffixes.append(f"@{self.current_domain}")
-            
-            # Also add organization domain (corp.com from corp.adenshomelab.com)
-            main_domain = '.'.join(self.current_domain.split('.')[-2:])
-            if f"@{main_domain}" not in suffixes:
-                suffixes.append(f"@{main_domain}")
-        
-        # Add default if needed
-        if not suffixes:
-            suffixes.append("@adenshomelab.com")
-            
-        return sorted(list(set(suffixes)))
+        # A list of its own, since edit mode may add the user's suffix to it
+        return list(get_upn_suffixes(self.current_domain, frozenset(self.domains.values())))
     
     def load_user_data(self):
         """Load user data from Active Directory for edit mode"""
@@ -80,43 +204,163 @@ class UserWindow(QWidget):
             return
             
         try:
-            # Get user schema attributes
-            schema_attrs = AttributesTab(self.ldap_conn, self.base_dn).get_user_schema_attributes()
+            # Search for user, fetching only what the form needs
+            user_values = self.read_user_entry(USER_ATTRIBUTES)
             
-            # Search for user
-            self.ldap_conn.search(
-                search_base=self.user_dn,
-                search_filter="(objectClass=user)",
-                search_scope="BASE",
-                attributes=['*']
-            )
-            
-            if not self.ldap_conn.entries:
+            if user_values is None:
                 QMessageBox.critical(self, "Error", f"User not found: {self.user_dn}")
                 self.close()
                 return
-                
-            # Get user data
-            user_entry = self.ldap_conn.entries[0]
             
             # Initialize with empty values
-            for attr_name in schema_attrs:
+            for attr_name in USER_ATTRIBUTES:
                 self.user_data[attr_name] = ""
             
             # Fill with actual values
-            for attr_name in user_entry.entry_attributes:
-                attr_val = getattr(user_entry, attr_name)
-                if attr_val.value is None:
-                    self.user_data[attr_name] = ""
-                elif isinstance(attr_val.value, list):
-                    self.user_data[attr_name] = attr_val.value
-                else:
-                    self.user_data[attr_name] = attr_val.value
+            self.user_data.update(user_values)
                     
         except Exception as e:
             QMessageBox.critical(self, "Error Loading User", f"Failed to load user data: {e}")
             self.close()
     
+    def load_all_attributes(self):
+        """
+        Load every attribute of the user for the Attributes tab.
+        
+        Runs the first time the tab is shown, so users who only edit the
+        form fields never download the full entry.
+        """
+        if self.all_attributes_loaded or not self.ldap_conn or not self.user_dn:
+            return
+        self.all_attributes_loaded = True
+        
+        try:
+            # Get user schema attributes
+            schema_attrs = self.attributes_tab.get_user_schema_attributes()
+            
+            user_values = self.read_user_entry(['*'])
+            if user_values is None:
+                return
+            
+            # Initialize with empty values, keeping what the form already has
+            for attr_name in schema_attrs:
+                self.user_data.setdefault(attr_name, "")
+            
+            # Fill with actual values
+            self.user_data.update(user_values)
+            self.attributes_tab.set_attributes(self.user_data)
+        except Exception as e:
+            QMessageBox.critical(self, "Error Loading User", f"Failed to load user attributes: {e}")
+    
+    def read_user_entry(self, attributes):
+        """
+        Read the user's entry over a pooled connection
+        
+        Args:
+            attributes: Attribute names to fetch
+            
+        Returns:
+            Dictionary of attribute name:value pairs, with "" for empty
+            values, or None if the user wasn't found
+        """
+        with self.connection_pool.get() as conn:
+            conn.search(
+                search_base=self.user_dn,
+                search_filter="(objectClass=user)",
+                search_scope="BASE",
+                attributes=attributes
+            )
+            # Read the raw response rather than conn.entries, which would
+            # wrap every attribute in ldap3 Entry and Attribute objects
+            entries = [item for item in conn.response if item.get("type") == "searchResEntry"]
+            if not entries:
+                return None
+            raw = entries[0]["attributes"]
+        
+        # Values of multi-valued attributes come as lists; unwrap single
+        # values the way Attribute.value would
+        values = {}
+        for attr_name, value in raw.items():
+            if isinstance(value, list) and attr_name not in LIST_ATTRIBUTES and len(value) <= 1:
+                value = value[0] if value else ""
+            values[attr_name] = "" if value is None else value
+        return values
+    
+    def add_placeholder_tabs(self):
+        """
+        Add empty Group Membership and Attributes tabs to the tab widget
+        
+        The real tabs replace them the first time they're opened, so a user
+        who only edits the form never pays for building them.
+        """
+        self.groups_placeholder = QWidget()
+        self.attributes_placeholder = QWidget()
+        self.tab_widget.addTab(self.groups_placeholder, "Group Membership")
+        self.tab_widget.addTab(self.attributes_placeholder, "Attributes")
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
+    
+    def replace_placeholder_tab(self, placeholder, tab):
+        """
+        Swap a placeholder tab for the real one, keeping its position
+        
+        Args:
+            placeholder: Placeholder widget added by add_placeholder_tabs
+            tab: Widget to show in its place
+        """
+        index = self.tab_widget.indexOf(placeholder)
+        was_current = self.tab_widget.currentIndex() == index
+        title = self.tab_widget.tabText(index)
+        
+        # Removing the current tab selects a neighbour, which mustn't build
+        # the other lazy tab
+        self.tab_widget.blockSignals(True)
+        try:
+            self.tab_widget.removeTab(index)
+            self.tab_widget.insertTab(index, tab, title)
+            if was_current:
+                self.tab_widget.setCurrentIndex(index)
+        finally:
+            self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+    
+    def get_groups_tab(self):
+        """
+        Get the Group Membership tab, building it on first use
+        
+        Returns:
+            GroupsTab instance
+        """
+        if self.groups_tab is None:
+            self.groups_tab = GroupsTab(self, self.ldap_conn, self.base_dn)
+            if self.mode == UserOperation.EDIT:
+                self.groups_tab.set_edit_mode(True, self.user_data.get('memberOf', []))
+            self.replace_placeholder_tab(self.groups_placeholder, self.groups_tab)
+        return self.groups_tab
+    
+    def get_attributes_tab(self):
+        """
+        Get the Attributes tab, building it on first use
+        
+        Returns:
+            AttributesTab instance
+        """
+        if self.attributes_tab is None:
+            self.attributes_tab = AttributesTab(self, self.ldap_conn, self.base_dn)
+            if self.mode == UserOperation.EDIT:
+                self.attributes_tab.set_attributes(self.user_data)
+            self.replace_placeholder_tab(self.attributes_placeholder, self.attributes_tab)
+            if self.mode == UserOperation.EDIT:
+                self.load_all_attributes()
+        return self.attributes_tab
+    
+    def on_tab_changed(self, index):
+        """Build the Group Membership or Attributes tab when first opened"""
+        widget = self.tab_widget.widget(index)
+        if widget is self.groups_placeholder:
+            self.get_groups_tab()
+        elif widget is self.attributes_placeholder:
+            self.get_attributes_tab()
+    
     def setup_ui(self):
         """Set up the UI based on current mode (create or edit)"""
         print(f"Mode: {self.mode}, CREATE: {UserOperation.CREATE}")
@@ -175,6 +419,7 @@ class UserWindow(QWidget):
         
         # Tab widget
         tab_widget = QTabWidget()
+        self.tab_widget = tab_widget
         
         # Basic Info Tab
         basic_tab = QWidget()
@@ -186,10 +431,13 @@ class UserWindow(QWidget):
         ou_form.setSpacing(10)
         ou_form.setLabelAlignment(Qt.AlignmentFlag.AlignRight)
         
+        # Added in one call, with the DNs kept in a list alongside rather than
+        # as item data, since domains can have thousands of OUs
         self.ou_combo = QComboBox()
         sorted_ous = sorted(self.ou_list, key=lambda x: x[0])
-        for display, ou_dn in sorted_ous:
-            self.ou_combo.addItem(display, ou_dn)
+        self.ou_dns = [ou_dn for _, ou_dn in sorted_ous]
+        self.ou_index = {ou_dn: i for i, ou_dn in enumerate(self.ou_dns)}  # DN -> combo index
+        self.ou_combo.addItems([display for display, _ in sorted_ous])
             
         ou_form.addRow("Select OU:", self.ou_combo)
         ou_group.setLayout(ou_form)
@@ -201,13 +449,7 @@ class UserWindow(QWidget):
         person_form.setSpacing(10)
         person_form.setLabelAlignment(Qt.AlignmentFlag.AlignRight)
         
-        self.first_name_edit = QLineEdit()
-        self.last_name_edit = QLineEdit()
-        self.display_name_edit = QLineEdit()
-        
-        person_form.addRow("First Name:", self.first_name_edit)
-        person_form.addRow("Last Name:", self.last_name_edit)
-        person_form.addRow("Display Name:", self.display_name_edit)
+        self.add_text_fields(person_form, PERSON_FIELDS[:3])
         person_group.setLayout(person_form)
         basic_layout.addWidget(person_group)
         
@@ -267,13 +509,7 @@ class UserWindow(QWidget):
         job_form.setSpacing(10)
         job_form.setLabelAlignment(Qt.AlignmentFlag.AlignRight)
         
-        self.job_title_edit = QLineEdit()
-        self.department_edit = QLineEdit()
-        self.company_edit = QLineEdit()
-        
-        job_form.addRow("Job Title:", self.job_title_edit)
-        job_form.addRow("Department:", self.department_edit)
-        job_form.addRow("Company:", self.company_edit)
+        self.add_text_fields(job_form, JOB_FIELDS[:3])
         job_group.setLayout(job_form)
         additional_layout.addWidget(job_group)
         
@@ -283,41 +519,21 @@ class UserWindow(QWidget):
         address_form.setSpacing(10)
         address_form.setLabelAlignment(Qt.AlignmentFlag.AlignRight)
         
-        self.street_edit = QLineEdit()
-        self.city_edit = QLineEdit()
-        self.state_edit = QLineEdit()
-        self.postal_edit = QLineEdit()
+        self.add_text_fields(address_form, ADDRESS_FIELDS)
         
         # Country dropdown
-        self.country_combo = QComboBox()
-        countries = [
-            ("United States", "US", "840"),
-            ("Canada", "CA", "124"),
-            ("United Kingdom", "GB", "826")
-        ]
-        
-        for country_name, country_code, country_num in countries:
-            self.country_combo.addItem(country_name, (country_code, country_num))
+        self.country_combo = self.make_country_combo()
             
-        address_form.addRow("Street Address:", self.street_edit)
-        address_form.addRow("City:", self.city_edit)
-        address_form.addRow("State/Province:", self.state_edit)
-        address_form.addRow("Postal Code:", self.postal_edit)
         address_form.addRow("Country:", self.country_combo)
         
         address_group.setLayout(address_form)
         additional_layout.addWidget(address_group)
         additional_layout.addStretch()
         
-        # Create specialized tabs
-        self.attributes_tab = AttributesTab(self, self.ldap_conn, self.base_dn)
-        self.groups_tab = GroupsTab(self, self.ldap_conn, self.base_dn)
-        
         # Add tabs to widget
         tab_widget.addTab(basic_tab, "Basic Info")
         tab_widget.addTab(additional_tab, "Job & Address")
-        tab_widget.addTab(self.groups_tab, "Group Membership")
-        tab_widget.addTab(self.attributes_tab, "Attributes")
+        self.add_placeholder_tabs()
         
         main_layout.addWidget(tab_widget)
         
@@ -344,10 +560,45 @@ class UserWindow(QWidget):
         self.setLayout(main_layout)
 
         # Connect signals for real-time updates
+        # Username suggestions need a directory lookup, so wait for a pause
+        # in typing rather than searching on every keystroke
+        self.sam_timer = QTimer(self)
+        self.sam_timer.setSingleShot(True)
+        self.sam_timer.setInterval(SAM_DEBOUNCE_MS)
+        self.sam_timer.timeout.connect(self.suggest_sam_account)
         self.first_name_edit.textChanged.connect(self.auto_update_fields)
         self.last_name_edit.textChanged.connect(self.auto_update_fields)
         self.sam_account_edit.textChanged.connect(self.sync_upn_field)
     
+    def make_country_combo(self):
+        """
+        Create the Country dropdown
+        
+        Returns:
+            QComboBox listing COUNTRIES, each with its (ISO code, numeric
+            code) pair as item data
+        """
+        combo = QComboBox()
+        for country_name, country_code, country_num in COUNTRIES:
+            combo.addItem(country_name, (country_code, country_num))
+        return combo
+    
+    def add_text_fields(self, form, fields):
+        """
+        Add a row with a line edit for each field to a form
+        
+        Each line edit is stored on the window under its widget attribute
+        name and starts with the user's current value, if any.
+        
+        Args:
+            form: QFormLayout to add the rows to
+            fields: Tuple of (widget attribute, label, LDAP attribute)
+        """
+        for name, label, attr in fields:
+            edit = QLineEdit(self.user_data.get(attr, ''))
+            setattr(self, name, edit)
+            form.addRow(label, edit)
+    
     def setup_edit_mode_ui(self):
         """Setup UI for edit mode"""
         main_layout = QVBoxLayout()
@@ -370,6 +621,7 @@ class UserWindow(QWidget):
         
         # Tab widget
         tab_widget = QTabWidget()
+        self.tab_widget = tab_widget
         
         # General Tab
         general_tab = QWidget()
@@ -381,19 +633,7 @@ class UserWindow(QWidget):
         person_form.setSpacing(10)
         person_form.setLabelAlignment(Qt.AlignmentFlag.AlignRight)
         
-        self.first_name_edit = QLineEdit(self.user_data.get('givenName', ''))
-        self.last_name_edit = QLineEdit(self.user_data.get('sn', ''))
-        self.display_name_edit = QLineEdit(self.user_data.get('displayName', ''))
-        self.email_edit = QLineEdit(self.user_data.get('mail', ''))
-        self.phone_edit = QLineEdit(self.user_data.get('telephoneNumber', ''))
-        self.mobile_edit = QLineEdit(self.user_data.get('mobile', ''))
-        
-        person_form.addRow("First Name:", self.first_name_edit)
-        person_form.addRow("Last Name:", self.last_name_edit)
-        person_form.addRow("Display Name:", self.display_name_edit)
-        person_form.addRow("Email:", self.email_edit)
-        person_form.addRow("Phone:", self.phone_edit)
-        person_form.addRow("Mobile:", self.mobile_edit)
+        self.add_text_fields(person_form, PERSON_FIELDS)
         
         person_group.setLayout(person_form)
         general_layout.addWidget(person_group)
@@ -410,42 +650,35 @@ class UserWindow(QWidget):
         
         # UPN with suffix
         upn = self.user_data.get('userPrincipalName', '')
-        upn_prefix, upn_suffix = upn, ""
-        if '@' in upn:
-            upn_parts = upn.split('@', 1)
-            upn_prefix = upn_parts[0]
-            upn_suffix = '@' + upn_parts[1]
+        upn_prefix, sep, upn_domain = upn.partition('@')
+        upn_suffix = '@' + upn_domain if sep else ""
         
         upn_layout = QHBoxLayout()
         self.upn_edit = QLineEdit(upn_prefix)
         self.upn_suffix_combo = QComboBox()
         
-        # Add current suffix if not in list
+        # Add current suffix if not in list; the list is this window's own
+        # copy and already sorted
         if upn_suffix and upn_suffix not in self.domain_suffixes:
-            self.domain_suffixes.append(upn_suffix)
-            self.domain_suffixes.sort()
+            bisect.insort(self.domain_suffixes, upn_suffix)
             
         self.upn_suffix_combo.addItems(self.domain_suffixes)
         
         # Select current suffix
         if upn_suffix:
-            suffix_idx = self.upn_suffix_combo.findText(upn_suffix)
-            if suffix_idx >= 0:
-                self.upn_suffix_combo.setCurrentIndex(suffix_idx)
+            self.upn_suffix_combo.setCurrentIndex(self.domain_suffixes.index(upn_suffix))
                 
         upn_layout.addWidget(self.upn_edit)
         upn_layout.addWidget(self.upn_suffix_combo)
         
         # Account options
-        uac = self.user_data.get('userAccountControl', 0)
         self.disabled_chk = QCheckBox("Account is disabled")
-        self.disabled_chk.setChecked(bool(uac & 2))  # ADS_UF_ACCOUNTDISABLE
-        
         self.pwd_never_expires_chk = QCheckBox("Password never expires")
-        self.pwd_never_expires_chk.setChecked(bool(uac & 65536))  # ADS_UF_DONT_EXPIRE_PASSWD
-        
         self.cannot_change_pwd_chk = QCheckBox("User cannot change password")
-        self.cannot_change_pwd_chk.setChecked(bool(uac & 64))  # ADS_UF_PASSWD_CANT_CHANGE
+        
+        uac = self.user_data.get('userAccountControl') or 0
+        for chk_name, flag in UAC_CHECKBOX_FLAGS:
+            getattr(self, chk_name).setChecked(bool(uac & flag))
         
         self.pwd_expired_chk = QCheckBox("User must change password at next logon")
         self.pwd_expired_chk.setChecked(self.user_data.get('pwdLastSet', '') == 0)
@@ -486,15 +719,7 @@ class UserWindow(QWidget):
         job_form.setSpacing(10)
         job_form.setLabelAlignment(Qt.AlignmentFlag.AlignRight)
         
-        self.job_title_edit = QLineEdit(self.user_data.get('title', ''))
-        self.department_edit = QLineEdit(self.user_data.get('department', ''))
-        self.company_edit = QLineEdit(self.user_data.get('company', ''))
-        self.description_edit = QLineEdit(self.user_data.get('description', ''))
-        
-        job_form.addRow("Job Title:", self.job_title_edit)
-        job_form.addRow("Department:", self.department_edit)
-        job_form.addRow("Company:", self.company_edit)
-        job_form.addRow("Description:", self.description_edit)
+        self.add_text_fields(job_form, JOB_FIELDS)
         
         job_group.setLayout(job_form)
         job_layout.addWidget(job_group)
@@ -505,51 +730,25 @@ class UserWindow(QWidget):
         address_form.setSpacing(10)
         address_form.setLabelAlignment(Qt.AlignmentFlag.AlignRight)
         
-        self.street_edit = QLineEdit(self.user_data.get('streetAddress', ''))
-        self.city_edit = QLineEdit(self.user_data.get('l', ''))
-        self.state_edit = QLineEdit(self.user_data.get('st', ''))
-        self.postal_edit = QLineEdit(self.user_data.get('postalCode', ''))
+        self.add_text_fields(address_form, ADDRESS_FIELDS)
         
         # Country dropdown
-        self.country_combo = QComboBox()
-        countries = [
-            ("United States", "US", "840"),
-            ("Canada", "CA", "124"),
-            ("United Kingdom", "GB", "826")
-        ]
-        
-        for country_name, country_code, country_num in countries:
-            self.country_combo.addItem(country_name, (country_code, country_num))
+        self.country_combo = self.make_country_combo()
             
         # Set current country
-        current_country = self.user_data.get('c', '')
-        if current_country:
-            for i in range(self.country_combo.count()):
-                if self.country_combo.itemData(i)[0] == current_country:
-                    self.country_combo.setCurrentIndex(i)
-                    break
-        
-        address_form.addRow("Street Address:", self.street_edit)
-        address_form.addRow("City:", self.city_edit)
-        address_form.addRow("State/Province:", self.state_edit)
-        address_form.addRow("Postal Code:", self.postal_edit)
+        country_idx = COUNTRY_INDEX.get(self.user_data.get('c', ''))
+        if country_idx is not None:
+            self.country_combo.setCurrentIndex(country_idx)
+        
         address_form.addRow("Country:", self.country_combo)
         
         address_group.setLayout(address_form)
         job_layout.addWidget(address_group)
         
-        # Setup specialized tabs
-        self.attributes_tab = AttributesTab(self, self.ldap_conn, self.base_dn)
-        self.attributes_tab.set_attributes(self.user_data)
-        
-        self.groups_tab = GroupsTab(self, self.ldap_conn, self.base_dn)
-        self.groups_tab.set_edit_mode(True, self.user_data.get('memberOf', []))
-        
         # Add all tabs
         tab_widget.addTab(general_tab, "General")
         tab_widget.addTab(job_tab, "Job & Address")
-        tab_widget.addTab(self.groups_tab, "Group Membership")
-        tab_widget.addTab(self.attributes_tab, "Attributes")
+        self.add_placeholder_tabs()
         
         main_layout.addWidget(tab_widget)
         
@@ -592,26 +791,80 @@ class UserWindow(QWidget):
         # Update display name
         self.display_name_edit.setText(f"{first} {last}".strip())
         
-        # Auto-generate SAM account in create mode
+        # Auto-generate SAM account in create mode, once typing pauses
         if (first and last and not self.sam_account_edit.hasFocus() and 
                 self.mode == UserOperation.CREATE):
-            self.status_label.setText("Generating username...")
-            QApplication.processEvents()
-            
-            candidate = auto_generate_sam_account(first, last, self.ldap_conn)
-            if candidate:
-                # Add contractor suffix if needed
-                if hasattr(self, 'contractor_chk') and self.contractor_chk.isChecked():
-                    if len(candidate) > 17:  # Leave room for suffix
-                        candidate = candidate[:17]
-                    candidate += "-c"
-                
-                self.sam_account_edit.setText(candidate)
-                self.status_label.setText(f"Suggested username: {candidate}")
-            else:
-                self.status_label.setText("Could not generate a unique username")
+            self.sam_timer.start()
                 
         self.sync_upn_field()
+    
+    def suggest_sam_account(self):
+        """Look up a unique SAM account name for the entered name"""
+        first = self.first_name_edit.text().strip()
+        last = self.last_name_edit.text().strip()
+        if not first or not last or self.sam_account_edit.hasFocus():
+            return
+        
+        # Names already looked up in this window need no second search
+        cached = self.sam_cache.get((first.lower(), last.lower()))
+        if cached:
+            self.apply_sam_account(cached)
+            return
+        
+        # The lookup runs on the thread pool; a newer request replaces
+        # this one if the name changes before it finishes
+        self.status_label.setText("Generating username...")
+        self.sam_worker = LdapWorker(find_sam_account, self.connection_pool, first, last)
+        self.sam_worker.signals.finished.connect(self.on_sam_account_found)
+        self.sam_worker.signals.error.connect(self.on_sam_account_failed)
+        QThreadPool.globalInstance().start(self.sam_worker)
+    
+    def on_sam_account_found(self, result):
+        """
+        Fill in the SAM account name suggested for the entered name
+        
+        Args:
+            result: Tuple of (first, last, unique SAM account name or None)
+        """
+        # Drop replies to superseded requests, or for a name since edited
+        if self.sender() is not self.sam_worker.signals:
+            return
+        first, last, candidate = result
+        if candidate:
+            self.sam_cache[(first.lower(), last.lower())] = candidate
+        if (first != self.first_name_edit.text().strip() or last != self.last_name_edit.text().strip()
+                or self.sam_account_edit.hasFocus()):
+            return
+        self.apply_sam_account(candidate)
+    
+    def apply_sam_account(self, candidate):
+        """
+        Put a suggested SAM account name in the form
+        
+        Args:
+            candidate: Unique SAM account name, or None if none was found
+        """
+        if candidate:
+            # Add contractor suffix if needed
+            if hasattr(self, 'contractor_chk') and self.contractor_chk.isChecked():
+                if len(candidate) > 17:  # Leave room for suffix
+                    candidate = candidate[:17]
+                candidate += "-c"
+            
+            self.sam_account_edit.setText(candidate)
+            self.status_label.setText(f"Suggested username: {candidate}")
+        else:
+            self.status_label.setText("Could not generate a unique username")
+    
+    def on_sam_account_failed(self, error):
+        """
+        Report a failed SAM account lookup
+        
+        Args:
+            error: Exception raised by the lookup
+        """
+        if self.sender() is self.sam_worker.signals:
+            self.status_label.setText(f"Could not generate a username: {error}")
         
     def sync_upn_field(self):
         """Sync UPN prefix with SAM account"""
@@ -619,54 +872,87 @@ class UserWindow(QWidget):
     
     def connect_change_signals(self):
         """Connect signals to track field changes in edit mode"""
-        # Map fields to attributes
-        field_to_attr = {
-            self.first_name_edit: 'givenName',
-            self.last_name_edit: 'sn',
-            self.display_name_edit: 'displayName',
-            self.email_edit: 'mail',
-            self.phone_edit: 'telephoneNumber',
-            self.mobile_edit: 'mobile',
-            self.upn_edit: 'userPrincipalName',
-            self.job_title_edit: 'title',
-            self.department_edit: 'department',
-            self.company_edit: 'company',
-            self.description_edit: 'description',
-            self.street_edit: 'streetAddress',
-            self.city_edit: 'l',
-            self.state_edit: 'st',
-            self.postal_edit: 'postalCode'
+        # Map fields to attributes; every field reports to on_field_changed,
+        # which looks up the sender here
+        text_fields = {getattr(self, name): attr for name, _, attr in TEXT_FIELDS}
+        text_fields[self.upn_edit] = 'userPrincipalName'
+        check_boxes = {getattr(self, name): 'userAccountControl' for name, _ in UAC_CHECKBOX_FLAGS}
+        check_boxes[self.pwd_expired_chk] = 'pwdLastSet'
+        combo_boxes = {
+            self.upn_suffix_combo: 'userPrincipalName',
+            self.country_combo: 'country'
         }
+        self.field_attributes = {**text_fields, **check_boxes, **combo_boxes}
         
         # Connect text fields
-        for field, attr in field_to_attr.items():
-            field.textChanged.connect(lambda _, a=attr: self.mark_as_modified(a))
+        for field in text_fields:
+            field.textChanged.connect(self.on_field_changed)
         
         # Connect checkboxes and comboboxes
-        self.upn_suffix_combo.currentIndexChanged.connect(
-            lambda: self.mark_as_modified('userPrincipalName'))
-        self.disabled_chk.stateChanged.connect(
-            lambda: self.mark_as_modified('userAccountControl'))
-        self.pwd_never_expires_chk.stateChanged.connect(
-            lambda: self.mark_as_modified('userAccountControl'))
-        self.cannot_change_pwd_chk.stateChanged.connect(
-            lambda: self.mark_as_modified('userAccountControl'))
-        self.pwd_expired_chk.stateChanged.connect(
-            lambda: self.mark_as_modified('pwdLastSet'))
-        self.country_combo.currentIndexChanged.connect(
-            lambda: self.mark_as_modified('country'))
+        for check_box in check_boxes:
+            check_box.stateChanged.connect(self.on_field_changed)
+        for combo_box in combo_boxes:
+            combo_box.currentIndexChanged.connect(self.on_field_changed)
+    
+    def on_field_changed(self, *_):
+        """Mark the attribute of the edit mode field that changed as modified"""
+        attribute = self.field_attributes.get(self.sender())
+        if attribute:
+            self.mark_as_modified(attribute)
+    
+    def current_uac(self):
+        """
+        Get the userAccountControl value the edit mode checkboxes describe
+        
+        Returns:
+            The user's original value with the checkbox flags set or cleared
+        """
+        uac = self.user_data.get('userAccountControl') or 0
+        for chk_name, flag in UAC_CHECKBOX_FLAGS:
+            if getattr(self, chk_name).isChecked():
+                uac |= flag
+            else:
+                uac &= ~flag
+        return uac
     
     def mark_as_modified(self, attribute):
         """Mark an attribute as modified in edit mode"""
-        self.modified_attributes[attribute] = True
+        self.modified_attributes.add(attribute)
+    
+    def current_ou_dn(self):
+        """
+        Get the DN of the OU selected in the OU dropdown
+        
+        Returns:
+            OU DN, or None if nothing is selected
+        """
+        index = self.ou_combo.currentIndex()
+        return self.ou_dns[index] if index >= 0 else None
     
     # Template management
     def update_template_list(self):
         """Update the template dropdown with available templates"""
-        self.template_combo.clear()
-        self.template_combo.addItem("-- Select Template --", None)
-        for name in self.template_manager.get_template_names():
-            self.template_combo.addItem(name, name)
+        # Refill in one go without repainting after every item
+        self.template_combo.setUpdatesEnabled(False)
+        try:
+            self.template_combo.clear()
+            self.template_combo.addItems(["-- Select Template --"] + self.template_manager.get_template_names())
+        finally:
+            self.template_combo.setUpdatesEnabled(True)
+    
+    def update_template_list_widget(self, template_list):
+        """
+        Refill a Manage Templates list with the available templates
+        
+        Args:
+            template_list: QListWidget to fill
+        """
+        template_list.setUpdatesEnabled(False)
+        try:
+            template_list.clear()
+            template_list.addItems(self.template_manager.get_template_names())
+        finally:
+            template_list.setUpdatesEnabled(True)
             
     def save_current_as_template(self):
         """Save current form values as a new template"""
@@ -677,7 +963,7 @@ class UserWindow(QWidget):
                 "company": self.company_edit.text(),
                 "department": self.department_edit.text(),
                 "jobTitle": self.job_title_edit.text(),
-                "ou": self.ou_combo.currentData() if hasattr(self, 'ou_combo') else None,
+                "ou": self.current_ou_dn() if hasattr(self, 'ou_combo') else None,
                 "street": self.street_edit.text(),
                 "city": self.city_edit.text(),
                 "state": self.state_edit.text(),
@@ -687,9 +973,9 @@ class UserWindow(QWidget):
                     "mustChange": self.change_password_chk.isChecked() if hasattr(self, 'change_password_chk') else False,
                     "neverExpires": self.never_expires_chk.isChecked() if hasattr(self, 'never_expires_chk') else False
                 },
-                "selectedGroups": self.groups_tab.get_selected_groups(),
+                "selectedGroups": self.groups_tab.get_selected_groups() if self.groups_tab else [],
                 "isContractor": self.contractor_chk.isChecked() if hasattr(self, 'contractor_chk') else False,
-                "customAttributes": self.attributes_tab.get_attributes()
+                "customAttributes": self.attributes_tab.get_attributes() if self.attributes_tab else {}
             }
             
             template = UserTemplate(name, settings)
@@ -706,9 +992,11 @@ class UserWindow(QWidget):
             
     def load_template(self):
         """Load selected template into the form"""
-        template_name = self.template_combo.currentData()
-        if not template_name:
+        # Index 0 is the "-- Select Template --" placeholder
+        index = self.template_combo.currentIndex()
+        if index <= 0:
             return
+        template_name = self.template_combo.itemText(index)
             
         template = self.template_manager.get_template(template_name)
         if not template:
@@ -725,8 +1013,11 @@ class UserWindow(QWidget):
         preview_text.setReadOnly(True)
         
         # Format template data for preview
-        preview_html = f"<h3>Template: {template.name}</h3>"
-        preview_html += "<table border='0' cellspacing='5' cellpadding='5'>"
+        # Rows are collected in a list and joined once at the end
+        parts = [
+            f"<h3>Template: {template.name}</h3>",
+            "<table border='0' cellspacing='5' cellpadding='5'>"
+        ]
         
         for key, value in template.settings.items():
             if key == "passwordOptions":
@@ -736,27 +1027,24 @@ class UserWindow(QWidget):
                     options_list.append("User must change password at next logon")
                 if pw_options.get("neverExpires", False):
                     options_list.append("Password never expires")
-                preview_html += f"<tr><td><b>Password Options:</b></td><td>{', '.join(options_list)}</td></tr>"
+                parts.append(f"<tr><td><b>Password Options:</b></td><td>{', '.join(options_list)}</td></tr>")
             elif key == "selectedGroups" and value:
-                preview_html += f"<tr><td><b>Groups:</b></td><td>{', '.join(value)}</td></tr>"
+                parts.append(f"<tr><td><b>Groups:</b></td><td>{', '.join(value)}</td></tr>")
             elif key == "country" and value is not None:
                 country_code, country_num = value
-                country_name = "Unknown"
-                for i in range(self.country_combo.count()):
-                    if self.country_combo.itemData(i) == value:
-                        country_name = self.country_combo.itemText(i)
-                        break
-                preview_html += f"<tr><td><b>Country:</b></td><td>{country_name} ({country_code})</td></tr>"
+                country_idx = COUNTRY_INDEX.get(country_code)
+                country_name = COUNTRIES[country_idx][0] if country_idx is not None else "Unknown"
+                parts.append(f"<tr><td><b>Country:</b></td><td>{country_name} ({country_code})</td></tr>")
             elif key == "isContractor":
-                preview_html += f"<tr><td><b>Contractor:</b></td><td>{'Yes' if value else 'No'}</td></tr>"
+                parts.append(f"<tr><td><b>Contractor:</b></td><td>{'Yes' if value else 'No'}</td></tr>")
             elif key == "customAttributes" and value:
                 attr_list = [f"{attr}: {val}" for attr, val in value.items()]
-                preview_html += f"<tr><td><b>Custom Attributes:</b></td><td>{', '.join(attr_list)}</td></tr>"
+                parts.append(f"<tr><td><b>Custom Attributes:</b></td><td>{', '.join(attr_list)}</td></tr>")
             else:
-                preview_html += f"<tr><td><b>{key}:</b></td><td>{value}</td></tr>"
+                parts.append(f"<tr><td><b>{key}:</b></td><td>{value}</td></tr>")
         
-        preview_html += "</table>"
-        preview_text.setHtml(preview_html)
+        parts.append("</table>")
+        preview_text.setHtml("".join(parts))
         layout.addWidget(preview_text)
         
         # Buttons
@@ -781,55 +1069,58 @@ class UserWindow(QWidget):
         """Apply the template to the form"""
         settings = template.settings
         
-        # Apply settings to form fields
-        field_mappings = {
-            "company": self.company_edit,
-            "department": self.department_edit,
-            "jobTitle": self.job_title_edit,
-            "street": self.street_edit,
-            "city": self.city_edit,
-            "state": self.state_edit,
-            "postalCode": self.postal_edit
-        }
-        
-        # Set text fields
-        for key, field in field_mappings.items():
-            if key in settings:
-                field.setText(settings[key])
-        
-        # Set OU if it exists in our list and we have an OU combo
-        if "ou" in settings and hasattr(self, 'ou_combo'):
-            for i in range(self.ou_combo.count()):
-                if self.ou_combo.itemData(i) == settings["ou"]:
-                    self.ou_combo.setCurrentIndex(i)
-                    break
-        
-        # Set country
-        if "country" in settings:
-            for i in range(self.country_combo.count()):
-                if self.country_combo.itemData(i) == settings["country"]:
-                    self.country_combo.setCurrentIndex(i)
-                    break
-        
-        # Password options - applicable to create mode
-        if "passwordOptions" in settings:
-            pw_options = settings["passwordOptions"]
-            if hasattr(self, 'change_password_chk') and "mustChange" in pw_options:
-                self.change_password_chk.setChecked(pw_options["mustChange"])
-            if hasattr(self, 'never_expires_chk') and "neverExpires" in pw_options:
-                self.never_expires_chk.setChecked(pw_options["neverExpires"])
-        
-        # Contractor status - applicable to create mode
-        if "isContractor" in settings and hasattr(self, 'contractor_chk'):
-            self.contractor_chk.setChecked(settings["isContractor"])
-        
-        # Groups
-        if "selectedGroups" in settings and settings["selectedGroups"]:
-            self.groups_tab.set_selected_groups(settings["selectedGroups"])
-        
-        # Custom attributes
-        if "customAttributes" in settings and settings["customAttributes"]:
-            self.attributes_tab.set_attributes(settings["customAttributes"])
+        # Repaint the form once when done rather than after every field
+        self.setUpdatesEnabled(False)
+        try:
+            # Apply settings to form fields
+            field_mappings = {
+                "company": self.company_edit,
+                "department": self.department_edit,
+                "jobTitle": self.job_title_edit,
+                "street": self.street_edit,
+                "city": self.city_edit,
+                "state": self.state_edit,
+                "postalCode": self.postal_edit
+            }
+            
+            # Set text fields
+            for key, field in field_mappings.items():
+                if key in settings:
+                    field.setText(settings[key])
+            
+            # Set OU if it exists in our list and we have an OU combo
+            if "ou" in settings and hasattr(self, 'ou_combo'):
+                ou_idx = self.ou_index.get(settings["ou"])
+                if ou_idx is not None:
+                    self.ou_combo.setCurrentIndex(ou_idx)
+            
+            # Set country; saved templates hold the (code, number) pair as a list
+            if settings.get("country"):
+                country_idx = COUNTRY_INDEX.get(settings["country"][0])
+                if country_idx is not None:
+                    self.country_combo.setCurrentIndex(country_idx)
+            
+            # Password options - applicable to create mode
+            if "passwordOptions" in settings:
+                pw_options = settings["passwordOptions"]
+                if hasattr(self, 'change_password_chk') and "mustChange" in pw_options:
+                    self.change_password_chk.setChecked(pw_options["mustChange"])
+                if hasattr(self, 'never_expires_chk') and "neverExpires" in pw_options:
+                    self.never_expires_chk.setChecked(pw_options["neverExpires"])
+            
+            # Contractor status - applicable to create mode
+            if "isContractor" in settings and hasattr(self, 'contractor_chk'):
+                self.contractor_chk.setChecked(settings["isContractor"])
+            
+            # Groups
+            if "selectedGroups" in settings and settings["selectedGroups"]:
+                self.get_groups_tab().set_selected_groups(settings["selectedGroups"])
+            
+            # Custom attributes
+            if "customAttributes" in settings and settings["customAttributes"]:
+                self.get_attributes_tab().set_attributes(settings["customAttributes"])
+        finally:
+            self.setUpdatesEnabled(True)
         
         QMessageBox.information(self, "Template Applied", 
                              f"Template '{template.name}' applied successfully")
@@ -848,7 +1139,6 @@ class UserWindow(QWidget):
         layout.addWidget(list_label)
         
         template_list = QListWidget()
-        template_list.addItems(self.template_manager.get_template_names())
         layout.addWidget(template_list)
         
         # Buttons for managing templates
@@ -874,6 +1164,8 @@ class UserWindow(QWidget):
         layout.addWidget(close_btn)
         
         dialog.setLayout(layout)
+        # Fill the list once the dialog is up, so it opens without waiting
+        QTimer.singleShot(0, lambda: self.update_template_list_widget(template_list))
         dialog.exec()
         
     def delete_template(self, template_list):
@@ -898,8 +1190,7 @@ class UserWindow(QWidget):
                 QMessageBox.information(self, "Template Deleted", 
                                       f"Template '{template_name}' deleted successfully")
                 # Update the list
-                template_list.clear()
-                template_list.addItems(self.template_manager.get_template_names())
+                self.update_template_list_widget(template_list)
                 
                 # Update the dropdown
                 self.update_template_list()
@@ -935,8 +1226,7 @@ class UserWindow(QWidget):
                                       f"{count} templates imported successfully")
                                       
                 # Update the list
-                template_list.clear()
-                template_list.addItems(self.template_manager.get_template_names())
+                self.update_template_list_widget(template_list)
                 
                 # Update the dropdown
                 self.update_template_list()
@@ -957,7 +1247,7 @@ class UserWindow(QWidget):
         upn = f"{self.upn_edit.text()}{upn_suffix}"
         password = self.password_edit.text()
         confirm_password = self.confirm_password_edit.text()
-        ou_dn = self.ou_combo.currentData()
+        ou_dn = self.current_ou_dn()
 
         if not all([first, last, password, confirm_password]):
             QMessageBox.warning(self, "Input Error", "Please fill in all required fields (First Name, Last Name, Password).")
@@ -974,7 +1264,8 @@ class UserWindow(QWidget):
             self.display_name_edit.setText(display_name)
 
         if not sam_account:
-            candidate = auto_generate_sam_account(first, last, self.ldap_conn)
+            with self.connection_pool.get() as conn:
+                candidate = auto_generate_sam_account(first, last, conn)
             if candidate is None:
                 reply = QMessageBox.question(
                     self, "SAM Account Name",
@@ -1000,26 +1291,19 @@ class UserWindow(QWidget):
                 self.upn_edit.setText(sam_account)
 
         new_user_dn = f"CN={display_name},{ou_dn}"
-        
-        # Create a new connection using the same DC but port 636
-        dc_host = self.ldap_conn.server.host
-        bind_user = self.ldap_conn.user
-        bind_pass = self.ldap_conn.password
 
         try:
-            # Create server with SSL
-            server = Server(dc_host, port=636, use_ssl=True)
+            # Writes go over LDAPS to the same DC, on a connection kept open
+            # between users
+            write_conn = get_write_connection(self.connection_pool)
             
-            # Create connection with the server
-            write_conn = Connection(
-                server,
-                user=bind_user,
-                password=bind_pass,
-                authentication='SIMPLE',
-                auto_bind=True
-            )
+            # A normal account, with the password set never to expire unless
+            # that option was unticked
+            uac = UAC_NORMAL_ACCOUNT
+            if self.never_expires_chk.isChecked():
+                uac |= UAC_DONT_EXPIRE_PASSWD
             
-            # Base attributes with password never expires by default (66048 = 512 | 0x10000)
+            # Base attributes
             attributes = {
                 "objectClass": ["top", "person", "organizationalPerson", "user"],
                 "cn": display_name,
@@ -1029,40 +1313,16 @@ class UserWindow(QWidget):
                 "sAMAccountName": sam_account,
                 "userPrincipalName": upn,
                 "mail": upn,  # Set email to match UPN
-                "userAccountControl": 66048,  # Password never expires by default
+                "userAccountControl": uac,
                 "unicodePwd": encode_password(password)
             }
             
-            # Add job title and department if they're filled in
-            job_title = self.job_title_edit.text().strip()
-            if job_title:
-                attributes["title"] = job_title
-
-            department = self.department_edit.text().strip()
-            if department:
-                attributes["department"] = department
-                
-            # Add company if filled in
-            company = self.company_edit.text().strip()
-            if company:
-                attributes["company"] = company
-
-            # Add address information if filled in
-            street = self.street_edit.text().strip()
-            if street:
-                attributes["streetAddress"] = street
-                
-            city = self.city_edit.text().strip()
-            if city:
-                attributes["l"] = city
-                
-            state = self.state_edit.text().strip()
-            if state:
-                attributes["st"] = state
-                
-            postal = self.postal_edit.text().strip()
-            if postal:
-                attributes["postalCode"] = postal
+            # Add job and address information that's filled in, reading
+            # each field once
+            for widget_name, _, attr in OPTIONAL_CREATE_FIELDS:
+                value = getattr(self, widget_name).text().strip()
+                if value:
+                    attributes[attr] = value
 
             # Set country based on selection
             country_idx = self.country_combo.currentIndex()
@@ -1075,7 +1335,7 @@ class UserWindow(QWidget):
                 attributes["countryCode"] = country_num
                 
             # Add custom attributes from attributes tab
-            custom_attributes = self.attributes_tab.get_attributes()
+            custom_attributes = self.attributes_tab.get_attributes() if self.attributes_tab else {}
             for attr_name, value in custom_attributes.items():
                 # Skip attributes that are already set
                 if attr_name in attributes:
@@ -1086,12 +1346,11 @@ class UserWindow(QWidget):
             self.status_label.setText(f"Creating user: {display_name}...")
             QApplication.processEvents()
             
-            result = write_conn.add(new_user_dn, attributes=attributes)
+            _, result = write_conn.get_response(write_conn.add(new_user_dn, attributes=attributes))
             
-            if not result:
-                error_desc = write_conn.result.get('description', 'Unknown error')
-                error_msg = write_conn.result.get('message', '')
-                write_conn.unbind()
+            if result['result'] != RESULT_SUCCESS:
+                error_desc = result.get('description', 'Unknown error')
+                error_msg = result.get('message', '')
                 QMessageBox.critical(self, "Error", f"Failed to create user:\nDescription: {error_desc}\nMessage: {error_msg}")
                 self.status_label.setText("Error creating user")
                 return
@@ -1101,39 +1360,66 @@ class UserWindow(QWidget):
                 pwd_last_set = {
                     "pwdLastSet": [(MODIFY_REPLACE, [0])]
                 }
-                write_conn.modify(new_user_dn, pwd_last_set)
+                pwd_last_set_id = write_conn.modify(new_user_dn, pwd_last_set)
+            else:
+                pwd_last_set_id = None
                 
-            # Add user to selected groups
-            selected_groups = self.groups_tab.get_selected_groups()
+            # Add user to selected groups: send every request first, then
+            # collect the replies, instead of a round trip per group
+            selected_groups = self.groups_tab.get_selected_groups() if self.groups_tab else []
+            group_requests = []
             for group_name in selected_groups:
                 # Look up the group's DN
-                found_group = False
-                for group_info in self.groups_tab.all_groups:
-                    if group_info["name"] == group_name:
-                        group_dn = group_info["dn"]
-                        found_group = True
-                        break
-                        
-                if found_group:
-                    try:
-                        # Add the user to the group
-                        write_conn.modify(
-                            group_dn,
-                            {'member': [(MODIFY_ADD, [new_user_dn])]}
-                        )
-                    except Exception as e:
-                        QMessageBox.warning(
-                            self, 
-                            "Group Error", 
-                            f"Failed to add user to group {group_name}: {e}"
-                        )
+                group_info = self.groups_tab.groups_by_name.get(group_name)
+                if group_info:
+                    message_id = write_conn.modify(
+                        group_info["dn"],
+                        {'member': [(MODIFY_ADD, [new_user_dn])]}
+                    )
+                    group_requests.append((group_name, message_id))
+            
+            if pwd_last_set_id is not None:
+                try:
+                    _, result = write_conn.get_response(pwd_last_set_id)
+                    pwd_last_set_error = None
+                    if result['result'] != RESULT_SUCCESS:
+                        pwd_last_set_error = result.get('description', 'Unknown error')
+                except LDAPException as e:
+                    pwd_last_set_error = str(e)
+                if pwd_last_set_error:
+                    QMessageBox.warning(
+                        self,
+                        "Password Error",
+                        f"User was created, but 'must change password at next logon' could not be set:\n{pwd_last_set_error}"
+                    )
+            
+            group_errors = []
+            for group_name, message_id in group_requests:
+                try:
+                    _, result = write_conn.get_response(message_id)
+                except LDAPException as e:
+                    group_errors.append(f"{group_name}: {e}")
+                    continue
+                if result['result'] != RESULT_SUCCESS:
+                    group_errors.append(f"{group_name}: {result.get('description', 'Unknown error')}")
+            
+            if group_errors:
+                QMessageBox.warning(
+                    self, 
+                    "Group Error", 
+                    "Failed to add user to groups:\n" + "\n".join(group_errors)
+                )
 
-            write_conn.unbind()
+            # The new account's name is taken now
+            self.sam_cache.clear()
+            clear_sam_cache()
             self.status_label.setText("User created successfully")
-            self.user_action_completed.emit()  # Emit signal to refresh the directory browser
+            self.user_action_completed.emit(new_user_dn)  # Emit signal to refresh the directory browser
             QTimer.singleShot(1000, self.close)  # Close after delay
 
         except LDAPException as e:
+            # The connection may have been dropped; open a new one next time
+            discard_write_connection(self.connection_pool)
             QMessageBox.critical(self, "LDAP Error", f"Exception: {e}")
             self.status_label.setText("LDAP error occurred")
         except Exception as e:
@@ -1148,24 +1434,10 @@ class UserWindow(QWidget):
         # Prepare modifications
         modifications = {}
         
-        # Personal info
-        if 'givenName' in self.modified_attributes:
-            modifications['givenName'] = [(MODIFY_REPLACE, [self.first_name_edit.text()])]
-            
-        if 'sn' in self.modified_attributes:
-            modifications['sn'] = [(MODIFY_REPLACE, [self.last_name_edit.text()])]
-            
-        if 'displayName' in self.modified_attributes:
-            modifications['displayName'] = [(MODIFY_REPLACE, [self.display_name_edit.text()])]
-            
-        if 'mail' in self.modified_attributes:
-            modifications['mail'] = [(MODIFY_REPLACE, [self.email_edit.text()])]
-            
-        if 'telephoneNumber' in self.modified_attributes:
-            modifications['telephoneNumber'] = [(MODIFY_REPLACE, [self.phone_edit.text()])]
-            
-        if 'mobile' in self.modified_attributes:
-            modifications['mobile'] = [(MODIFY_REPLACE, [self.mobile_edit.text()])]
+        # Plain text fields
+        for widget_name, _, attr in TEXT_FIELDS:
+            if attr in self.modified_attributes:
+                modifications[attr] = [(MODIFY_REPLACE, [getattr(self, widget_name).text()])]
         
         # Account info
         if 'userPrincipalName' in self.modified_attributes:
@@ -1176,26 +1448,7 @@ class UserWindow(QWidget):
         
         # UAC flags
         if 'userAccountControl' in self.modified_attributes:
-            # Get original UAC
-            uac = self.user_data.get('userAccountControl', 0)
-            
-            # Update flags based on checkboxes
-            if self.disabled_chk.isChecked():
-                uac |= 2  # ADS_UF_ACCOUNTDISABLE
-            else:
-                uac &= ~2
-                
-            if self.pwd_never_expires_chk.isChecked():
-                uac |= 65536  # ADS_UF_DONT_EXPIRE_PASSWD
-            else:
-                uac &= ~65536
-                
-            if self.cannot_change_pwd_chk.isChecked():
-                uac |= 64  # ADS_UF_PASSWD_CANT_CHANGE
-            else:
-                uac &= ~64
-                
-            modifications['userAccountControl'] = [(MODIFY_REPLACE, [uac])]
+            modifications['userAccountControl'] = [(MODIFY_REPLACE, [self.current_uac()])]
         
         # Password must change at next logon
         if 'pwdLastSet' in self.modified_attributes:
@@ -1212,32 +1465,6 @@ class UserWindow(QWidget):
             self.status_label.setText("Password mismatch")
             return
         
-        # Job info
-        if 'title' in self.modified_attributes:
-            modifications['title'] = [(MODIFY_REPLACE, [self.job_title_edit.text()])]
-            
-        if 'department' in self.modified_attributes:
-            modifications['department'] = [(MODIFY_REPLACE, [self.department_edit.text()])]
-            
-        if 'company' in self.modified_attributes:
-            modifications['company'] = [(MODIFY_REPLACE, [self.company_edit.text()])]
-            
-        if 'description' in self.modified_attributes:
-            modifications['description'] = [(MODIFY_REPLACE, [self.description_edit.text()])]
-        
-        # Address info
-        if 'streetAddress' in self.modified_attributes:
-            modifications['streetAddress'] = [(MODIFY_REPLACE, [self.street_edit.text()])]
-            
-        if 'l' in self.modified_attributes:
-            modifications['l'] = [(MODIFY_REPLACE, [self.city_edit.text()])]
-            
-        if 'st' in self.modified_attributes:
-            modifications['st'] = [(MODIFY_REPLACE, [self.state_edit.text()])]
-            
-        if 'postalCode' in self.modified_attributes:
-            modifications['postalCode'] = [(MODIFY_REPLACE, [self.postal_edit.text()])]
-            
         if 'country' in self.modified_attributes:
             country_idx = self.country_combo.currentIndex()
             if country_idx >= 0:
@@ -1249,15 +1476,11 @@ class UserWindow(QWidget):
                 modifications['countryCode'] = [(MODIFY_REPLACE, [country_num])]
         
         # Get any custom attributes from the attributes tab
-        custom_attributes = self.attributes_tab.get_attributes()
+        custom_attributes = self.attributes_tab.get_attributes() if self.attributes_tab else {}
         for attr_name, value in custom_attributes.items():
-            # Skip attributes that are handled elsewhere
-            if attr_name in modifications or attr_name in [
-                'givenName', 'sn', 'displayName', 'mail', 'telephoneNumber', 'mobile',
-                'userPrincipalName', 'userAccountControl', 'pwdLastSet', 'unicodePwd',
-                'title', 'department', 'company', 'description', 'streetAddress',
-                'l', 'st', 'postalCode', 'c', 'co', 'countryCode'
-            ]:
+            # Skip attributes that are handled elsewhere; every attribute
+            # modified above is one of these
+            if attr_name in FORM_ATTRIBUTES:
                 continue
                 
             # Compare with original values to see if modified
@@ -1271,7 +1494,7 @@ class UserWindow(QWidget):
                 result = self.ldap_conn.modify(self.user_dn, modifications)
                 if result:
                     self.status_label.setText("Changes saved successfully")
-                    self.user_action_completed.emit()
+                    self.user_action_completed.emit(self.user_dn)
                     QTimer.singleShot(1000, self.close)
                 else:
                     error_msg = self.ldap_conn.result.get('message', 'Unknown error')
@@ -1,15 +1,251 @@
 """
 Helper functions and shared utilities for the AD Management Tool
 """
-from ldap3 import Connection, SUBTREE
+import time
+import queue
+import threading
+import weakref
+from contextlib import contextmanager
+from ldap3 import Connection, SUBTREE, SYNC
+from ldap3.utils.conv import escape_filter_chars
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+# Most connections an LdapConnectionPool keeps open at once
+MAX_POOL_SIZE = 4
+
+# Seconds a SAM account existence check is reused before asking the DC again
+SAM_CACHE_TTL = 60
+
+# Double quote in UTF-16LE, wrapped around passwords sent to AD
+QUOTE_UTF16 = '"'.encode('utf-16-le')
+
+
+class LdapWorkerSignals(QObject):
+    """Signals emitted by an LdapWorker"""
+    finished = pyqtSignal(object)  # Return value of the call
+    error = pyqtSignal(object)     # Exception raised by the call
+    progress = pyqtSignal(object)  # Partial results reported by the call
+
+
+class LdapWorker(QRunnable):
+    """
+    Run a blocking LDAP call on a QThreadPool thread.
+
+    ldap3 connections are not safe for concurrent use, so callers sharing a
+    connection pass the same lock to every worker that touches it. Results
+    and errors are delivered through `signals` on the receiver's thread.
+    """
+    def __init__(self, fn, *args, lock=None, progress=False, **kwargs):
+        """
+        Args:
+            fn: Callable performing the LDAP work
+            *args: Positional arguments for fn
+            lock: Optional QMutex held while fn runs
+            progress: If True, fn also gets a `report` keyword argument it can
+                call with partial results, which are emitted as `progress`
+            **kwargs: Keyword arguments for fn
+        """
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.lock = lock
+        self.signals = LdapWorkerSignals()
+        if progress:
+            self.kwargs["report"] = self.signals.progress.emit
+
+    def run(self):
+        """Execute the call and emit its result"""
+        if self.lock:
+            self.lock.lock()
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(e)
+            return
+        finally:
+            if self.lock:
+                self.lock.unlock()
+        self.signals.finished.emit(result)
+
+
+class LdapConnectionPool:
+    """
+    Bounded pool of read-only connections sharing one server and login, plus
+    the one connection used for writes on that login.
+
+    ldap3 connections can't be used from two threads at once, so reads check
+    a connection out for the length of the call instead of queueing behind a
+    single shared one or binding a new one each time:
+
+        with pool.get() as conn:
+            conn.search(...)
+
+    At most max_pool_size connections are open; further callers wait until
+    one is returned. Connections are opened on first use. A connection is
+    held for the whole call, so a paged search's cookie stays on the
+    connection that issued it.
+
+    write_conn is opened and replaced by the caller that writes (the user
+    editor) and closed along with the pool.
+    """
+    def __init__(self, server, user, password, client_strategy=SYNC, max_pool_size=MAX_POOL_SIZE):
+        """
+        Args:
+            server: ldap3 Server to connect to
+            user: Bind user
+            password: Bind password
+            client_strategy: ldap3 client strategy for the pooled connections
+            max_pool_size: Most connections open at once
+        """
+        self.server = server
+        self.user = user
+        self.password = password
+        self.client_strategy = client_strategy
+        self.max_pool_size = max_pool_size
+        self.idle = queue.LifoQueue()  # Bound connections not checked out
+        self.slots = threading.BoundedSemaphore(max_pool_size)
+        self.closed = False  # Set by close(); returned connections are unbound
+        self.write_conn = None  # Connection for writes, closed with the pool
+
+    def open_connection(self):
+        """Open and bind a new pooled connection"""
+        return Connection(self.server, user=self.user, password=self.password,
+                          client_strategy=self.client_strategy, read_only=True, auto_bind=True)
+
+    @contextmanager
+    def get(self):
+        """
+        Check a connection out of the pool
+
+        Yields:
+            A bound Connection, returned to the pool when the block exits.
+            A connection whose block raised is closed rather than reused.
+        """
+        self.slots.acquire()
+        try:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                conn = None
+            if conn is None or conn.closed:
+                conn = self.open_connection()
+            try:
+                yield conn
+            except BaseException:
+                try:
+                    conn.unbind()
+                except Exception:
+                    pass
+                raise
+            if self.closed:
+                try:
+                    conn.unbind()
+                except Exception:
+                    pass
+            elif not conn.closed:
+                self.idle.put(conn)
+        finally:
+            self.slots.release()
+
+    def close(self):
+        """
+        Unbind the write connection and every idle connection, and each
+        checked-out one as it is returned
+        """
+        self.closed = True
+        write_conn, self.write_conn = self.write_conn, None
+        if write_conn is not None:
+            try:
+                write_conn.unbind()
+            except Exception:
+                pass
+        while True:
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                conn.unbind()
+            except Exception:
+                pass
+
+
+# Pools by the connection they copy their server and login from, shared by
+# every window using that connection. close_connection_pool() closes one when
+# its connection's browser closes.
+connection_pools = weakref.WeakKeyDictionary()
+connection_pools_lock = threading.Lock()
+
+
+def get_connection_pool(ldap_conn: Connection) -> LdapConnectionPool:
+    """
+    Get the shared connection pool for a connection
+    
+    Args:
+        ldap_conn: A bound LDAP connection to copy the server and credentials from
+        
+    Returns:
+        LdapConnectionPool: Pool of connections bound the same way
+    """
+    with connection_pools_lock:
+        pool = connection_pools.get(ldap_conn)
+        if pool is None or pool.closed:
+            pool = LdapConnectionPool(ldap_conn.server, ldap_conn.user, ldap_conn.password,
+                                      client_strategy=ldap_conn.strategy_type)
+            connection_pools[ldap_conn] = pool
+        return pool
+
+
+def close_connection_pool(ldap_conn: Connection):
+    """
+    Close and forget the connection pool opened for a connection. Call it
+    when the connection is closed.
+    
+    Args:
+        ldap_conn: The LDAP connection the pool was opened for
+    """
+    with connection_pools_lock:
+        pool = connection_pools.pop(ldap_conn, None)
+    if pool is not None:
+        pool.close()
+
 
 def domain_to_base_dn(domain: str) -> str:
     """
     Convert a full DNS domain (e.g., 'corp.adenshomelab.xyz') into a base DN.
     E.g., 'corp.adenshomelab.xyz' -> 'DC=corp,DC=adenshomelab,DC=xyz'
     """
-    parts = domain.split('.')
-    return ','.join(f"DC={part}" for part in parts)
+    return "DC=" + domain.replace(".", ",DC=")
+
+
+# Recent existence checks by (host, port, lowercased search base, lowercased
+# SAM account name): (timestamp, exists). The user editor looks names up on
+# worker threads, so it is only touched under sam_account_cache_lock.
+sam_account_cache = {}
+sam_account_cache_lock = threading.Lock()
+
+
+def clear_sam_cache():
+    """Forget recent SAM account existence checks, e.g. after creating an account"""
+    with sam_account_cache_lock:
+        sam_account_cache.clear()
+
+
+def cache_sam_accounts(results: dict, now: float):
+    """
+    Record SAM account existence checks, dropping any that have expired
+    
+    Args:
+        results: {cache key: exists}
+        now: time.monotonic() when the checks were made
+    """
+    with sam_account_cache_lock:
+        expired = [key for key, hit in sam_account_cache.items() if now - hit[0] >= SAM_CACHE_TTL]
+        for key in expired:
+            del sam_account_cache[key]
+        for key, exists in results.items():
+            sam_account_cache[key] = (now, exists)
 
 
 def check_sam_account_exists(sam_account: str, ldap_conn: Connection) -> bool:
@@ -17,6 +253,9 @@ def check_sam_account_exists(sam_account: str, ldap_conn: Connection) -> bool:
     Check if a SAM account with the given name exists in the enterprise.
     Uses an empty search base to search the entire forest.
     
+    Answers are reused for SAM_CACHE_TTL seconds, shared with
+    find_existing_sam_accounts.
+    
     Args:
         sam_account: The SAM account name to check
         ldap_conn: An active LDAP connection
@@ -24,12 +263,81 @@ def check_sam_account_exists(sam_account: str, ldap_conn: Connection) -> bool:
     Returns:
         bool: True if the account exists, False otherwise
     """
+    key = (ldap_conn.server.host, ldap_conn.server.port, "", sam_account.lower())
+    now = time.monotonic()
+    with sam_account_cache_lock:
+        hit = sam_account_cache.get(key)
+    if hit and now - hit[0] < SAM_CACHE_TTL:
+        return hit[1]
+    
     try:
-        ldap_conn.search(search_base="", search_filter=f"(sAMAccountName={sam_account})",
-                         search_scope=SUBTREE, attributes=["sAMAccountName"])
-        return bool(ldap_conn.entries)
+        # Existence check only: no attributes back, stop at the first match
+        ldap_conn.search(search_base="", search_filter=f"(sAMAccountName={escape_filter_chars(sam_account)})",
+                         search_scope=SUBTREE, attributes=["1.1"], size_limit=1)
+        exists = bool(ldap_conn.entries)
     except Exception:
+        # Not cached, so the next check tries the DC again
         return False
+    cache_sam_accounts({key: exists}, now)
+    return exists
+
+
+def find_existing_sam_accounts(sam_accounts: list, ldap_conn: Connection, search_base: str = "") -> set:
+    """
+    Find which of several SAM account names exist under a search base.
+    Names checked in the last SAM_CACHE_TTL seconds are answered from the
+    cache; the rest are looked up together in one search. The user editor
+    checks its suggested names here, so typing the same name again, or
+    creating the account it suggested, doesn't repeat the search.
+    
+    Args:
+        sam_accounts: SAM account names to check
+        ldap_conn: An active LDAP connection
+        search_base: DN to search under; empty to search the entire forest
+        
+    Returns:
+        set: Lowercased names that exist, or None if the search failed
+    """
+    host, port = ldap_conn.server.host, ldap_conn.server.port
+    base = search_base.lower()
+    now = time.monotonic()
+    existing = set()
+    unknown = []
+    with sam_account_cache_lock:
+        for name in dict.fromkeys(name.lower() for name in sam_accounts):
+            hit = sam_account_cache.get((host, port, base, name))
+            if hit and now - hit[0] < SAM_CACHE_TTL:
+                if hit[1]:
+                    existing.add(name)
+            else:
+                unknown.append(name)
+    if not unknown:
+        return existing
+    
+    try:
+        search_filter = "(|{})".format(
+            "".join(f"(sAMAccountName={escape_filter_chars(name)})" for name in unknown))
+        # No size limit: a forest-wide search can match one name in each domain
+        ldap_conn.search(search_base=search_base, search_filter=search_filter, search_scope=SUBTREE,
+                         attributes=["sAMAccountName"])
+        found = {str(entry.sAMAccountName.value).lower() for entry in ldap_conn.entries}
+        if ldap_conn.result.get('description') == 'sizeLimitExceeded':
+            # A partial result can't show which names are free; don't cache
+            # it, and check the names it didn't return one at a time
+            for name in unknown:
+                if name in found:
+                    continue
+                ldap_conn.search(search_base=search_base,
+                                 search_filter=f"(sAMAccountName={escape_filter_chars(name)})",
+                                 search_scope=SUBTREE, attributes=["1.1"], size_limit=1)
+                if ldap_conn.entries:
+                    found.add(name)
+            return existing | found
+    except Exception:
+        # Not cached, so the next check tries the DC again
+        return None
+    cache_sam_accounts({(host, port, base, name): name in found for name in unknown}, now)
+    return existing | found
 
 
 def auto_generate_sam_account(first: str, last: str, ldap_conn: Connection) -> str:
@@ -69,9 +377,11 @@ def auto_generate_sam_account(first: str, last: str, ldap_conn: Connection) -> s
     if cand3 and len(cand3) <= 20 and cand3 not in candidates:
         candidates.append(cand3)
     
-    # Check each candidate against the directory
+    # Check all the candidates against the forest in one search. A failed
+    # search treats them as free, as check_sam_account_exists does.
+    existing = find_existing_sam_accounts(candidates, ldap_conn) or set()
     for candidate in candidates:
-        if not check_sam_account_exists(candidate, ldap_conn):
+        if candidate not in existing:
             return candidate
     
     return None
@@ -87,18 +397,11 @@ def encode_password(password: str) -> bytes:
     Returns:
         bytes: The encoded password ready for LDAP
     """
-    password = '"{}"'.format(password)
-    return password.encode('utf-16-le')
+    return QUOTE_UTF16 + password.encode('utf-16-le') + QUOTE_UTF16
 
 
-def get_app_stylesheet() -> str:
-    """
-    Returns the application's stylesheet for a modern look
-    
-    Returns:
-        str: CSS stylesheet for the application
-    """
-    return """
+# Application stylesheet, built once at import
+APP_STYLESHEET = """
     QWidget {
         font-family: 'Segoe UI', Arial, sans-serif;
         font-size: 10pt;
@@ -150,17 +453,17 @@ def get_app_stylesheet() -> str:
         background-color: #e6e6e6;
     }
     
-    QTreeWidget, QTableWidget {
+    QTreeWidget, QTableView {
         border: 1px solid #ddd;
         border-radius: 4px;
         background-color: white;
     }
     
-    QTreeWidget::item, QTableWidget::item {
+    QTreeWidget::item, QTableView::item {
         padding: 4px;
     }
     
-    QTreeWidget::item:selected, QTableWidget::item:selected {
+    QTreeWidget::item:selected, QTableView::item:selected {
         background-color: #e7f0fd;
         color: #333;
     }
@@ -238,4 +541,18 @@ def get_app_stylesheet() -> str:
     QFrame#separator {
         background-color: #ddd;
     }
-    """
\ No newline at end of file
+    """
+
+# The stylesheet with its indentation and line breaks collapsed, so Qt's
+# parser has less text to scan when it is applied
+COMPACT_APP_STYLESHEET = " ".join(APP_STYLESHEET.split())
+
+
+def get_app_stylesheet() -> str:
+    """
+    Returns the application's stylesheet for a modern look
+    
+    Returns:
+        str: CSS stylesheet for the application
+    """
+    return COMPACT_APP_STYLESHEET